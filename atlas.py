@@ -0,0 +1,182 @@
+'''
+
+Description: This module packs the sprite images (planes, turret, missile,
+crosshair and every explosion frame) into one sheet, images/atlas.bmp, with
+a JSON index, images/atlas.json, of where each image is. The game then opens
+one file instead of about 50 and every sprite image is a subsurface of the
+sheet (no copy).
+
+The sheet is an uncompressed 32 bit BMP: it is bigger than a PNG on disk but
+loads about 10 times faster, and it is only a cache of the real images.
+
+The sheet is made again on its own when one of the images changes (checked
+with each file's size and modification time, and its SHA-1 when those
+differ, like after a fresh checkout).
+
+Usage: python atlas.py (makes the sheet again)
+
+'''
+
+import os
+import json
+import hashlib
+import pygame
+
+SHEET = 'images/atlas.bmp'
+INDEX = 'images/atlas.json'
+
+def fingerprint(path):
+    '''
+    This function returns [modification time, size] of a file.
+    '''
+    status = os.stat(path)
+    return [status.st_mtime_ns, status.st_size]
+
+def digest(path):
+    '''
+    This function returns the SHA-1 of a file's contents.
+    '''
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def pack(sizes, width, padding=1):
+    '''
+    This function places rectangles of the given (width, height) sizes in
+    rows (tallest first) no wider than width. It returns the (x, y) of each
+    one, in the same order as sizes, and the total height.
+    '''
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = rowHeight = 0
+    for i in order:
+        w, h = sizes[i]
+        # Start a new row when this one is full
+        if x and x + w > width:
+            x = 0
+            y += rowHeight + padding
+            rowHeight = 0
+        positions[i] = (x, y)
+        x += w + padding
+        rowHeight = max(rowHeight, h)
+    return positions, y + rowHeight
+
+def build(paths, sheet=SHEET, index=INDEX, width=512):
+    '''
+    This function packs the images at paths into sheet and writes index.
+    It does not need the display, so it can run on the loader's thread.
+    '''
+    images = []
+    for path in paths:
+        image = pygame.image.load(path)
+        # The same pixels convert_alpha() gives (a colour key becomes
+        # transparent), without the display's pixel format
+        images.append(pygame.image.frombytes(pygame.image.tobytes(image, 'RGBA'),
+                                             image.get_size(), 'RGBA'))
+    positions, height = pack([image.get_size() for image in images], width)
+
+    surface = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+    entries = {}
+    for path, image, position in zip(paths, images, positions):
+        # Copy the pixels exactly (a normal blit would blend the alpha)
+        surface.blit(image, position, special_flags=pygame.BLEND_RGBA_MAX)
+        entries[path] = {'rect': list(position) + list(image.get_size()),
+                         'file': fingerprint(path), 'sha1': digest(path)}
+
+    pygame.image.save(surface, sheet)
+    with open(index, 'w') as file:
+        json.dump({'size': [width, height], 'images': entries}, file, indent=1)
+
+def stale(paths, sheet=SHEET, index=INDEX):
+    '''
+    This function returns True if sheet has to be made again: it is missing,
+    holds other images, or one of the images changed.
+    '''
+    try:
+        with open(index, 'r') as file:
+            entries = json.load(file)['images']
+    except (OSError, ValueError, KeyError):
+        return True
+    if not os.path.exists(sheet) or set(entries) != set(paths):
+        return True
+
+    touched = False
+    for path in paths:
+        try:
+            current = fingerprint(path)
+        except OSError:
+            return True
+        if current != entries[path]['file']:
+            # Only the time changed (like after a checkout) if the contents
+            # are the same
+            if digest(path) != entries[path]['sha1']:
+                return True
+            entries[path]['file'] = current
+            touched = True
+
+    # Remember the new times so the files are not read again next time
+    if touched:
+        try:
+            with open(index, 'r') as file:
+                data = json.load(file)
+            data['images'] = entries
+            with open(index, 'w') as file:
+                json.dump(data, file, indent=1)
+        except OSError:
+            pass
+    return False
+
+def read(paths, sheet=SHEET, index=INDEX):
+    '''
+    This function returns (surface, rects): the sheet as it was loaded (not
+    converted, so this can run on any thread) and the rect of each of paths
+    in it, making the sheet first if needed. It returns None if the sheet
+    cannot be made (like in a read-only folder).
+    '''
+    try:
+        if stale(paths, sheet, index):
+            build(paths, sheet, index)
+        with open(index, 'r') as file:
+            entries = json.load(file)['images']
+        rects = dict((path, entries[path]['rect']) for path in paths)
+        return pygame.image.load(sheet), rects
+    except (OSError, ValueError, KeyError, pygame.error):
+        return None
+
+def views(surface, rects):
+    '''
+    This function converts a sheet returned by read() (main thread only) and
+    returns a dictionary of path to a subsurface of it for each of rects.
+    '''
+    surface = surface.convert_alpha()
+    return dict((path, surface.subsurface(rect)) for path, rect in rects.items())
+
+def load(paths, sheet=SHEET, index=INDEX):
+    '''
+    This function returns a dictionary of path to a subsurface of the sheet
+    for each of paths, making the sheet first if needed. It returns an empty
+    dictionary if the sheet cannot be made (like in a read-only folder), so
+    the images are loaded one by one instead.
+    '''
+    loaded = read(paths, sheet, index)
+    if not loaded:
+        return {}
+    try:
+        return views(*loaded)
+    except pygame.error:
+        return {}
+
+def main():
+    '''
+    This function makes the sheet again from the sprite images.
+    '''
+    # Imported here since gameSprites imports this module
+    import gameSprites
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pygame.init()
+    paths = gameSprites.assets.paths()
+    build(paths)
+    width, height = pygame.image.load(SHEET).get_size()
+    print(f'{len(paths)} images packed into {SHEET} ({width}x{height})')
+
+if __name__ == '__main__':
+    main()
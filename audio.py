@@ -0,0 +1,114 @@
+'''
+
+Description: This module plays the game's sound effects on a fixed number of
+mixer channels. All the plays of a sound in one frame become one louder play,
+each sound can only use so many channels at once, and when every channel is
+busy a more important sound takes the channel of a less important one.
+
+'''
+
+import math
+import collections
+import pygame
+
+class VoiceManager(object):
+    '''
+    This class owns a few mixer channels (reserved so pygame never uses them
+    on its own) and decides which channel, if any, each sound plays on.
+    '''
+    def __init__(self, sounds, budgets, priorities=None, volumes=None, first=0):
+        '''
+        This initializer takes 5 parameters:
+        sounds : a dictionary of name to pygame.mixer.Sound.
+        budgets : a dictionary of name to the most voices (channels) of that
+                  sound playing at once. The manager owns as many channels as
+                  all the budgets added up.
+        priorities : a dictionary of name to a number, when every channel is
+                     busy a sound can take the channel of a sound with the
+                     same or a lower number (0 if not given).
+        volumes : a dictionary of name to the volume of one play (1 if not
+                  given). Plays coalesced together are louder, up to 1.
+        first : the first mixer channel to use.
+        '''
+        self.sounds = sounds
+        self.budgets = budgets
+        self.priorities = priorities or {}
+        self.volumes = volumes or {}
+
+        total = sum(budgets.values())
+        if pygame.mixer.get_num_channels() < first + total:
+            pygame.mixer.set_num_channels(first + total)
+        pygame.mixer.set_reserved(first + total)
+        self.channels = [pygame.mixer.Channel(first + i) for i in range(total)]
+        # (name, priority, frame it started) of what each channel plays
+        self.voices = [None] * total
+        self.frame = 0
+
+        # Counters to check what happened to the plays asked for
+        self.played = 0
+        self.coalesced = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def pick(self, name):
+        '''
+        This method returns the index of the channel name should play on, or
+        None if it has to be dropped.
+        '''
+        # Forget voices that finished
+        for index, channel in enumerate(self.channels):
+            if self.voices[index] and not channel.get_busy():
+                self.voices[index] = None
+
+        priority = self.priorities.get(name, 0)
+        voices = self.voices
+        # Restart the oldest voice of this sound if it already uses its budget
+        mine = [index for index, voice in enumerate(voices) if voice and voice[0] == name]
+        if len(mine) >= self.budgets.get(name, 0):
+            if not mine:
+                return None
+            self.stolen += 1
+            return min(mine, key=lambda index: voices[index][2])
+
+        if None in voices:
+            return voices.index(None)
+
+        # Every channel is busy: take the oldest of the least important voices
+        # if it is not more important than this one.
+        index = min(range(len(voices)), key=lambda index: (voices[index][1], voices[index][2]))
+        if voices[index][1] > priority:
+            return None
+        self.stolen += 1
+        return index
+
+    def play(self, names):
+        '''
+        This method plays the sounds asked for during one frame (a list of
+        names, the same name can be in it many times).
+        '''
+        self.frame += 1
+        counts = collections.Counter(names)
+        # Most important sounds pick their channels first
+        for name in sorted(counts, key=lambda name: -self.priorities.get(name, 0)):
+            count = counts[name]
+            self.coalesced += count - 1
+            index = self.pick(name)
+            if index is None:
+                self.dropped += 1
+                continue
+
+            # Many explosions at once sound louder, not many times over
+            volume = min(1.0, self.volumes.get(name, 1.0) * math.sqrt(count))
+            channel = self.channels[index]
+            channel.play(self.sounds[name])
+            # Playing resets the channel's volume
+            channel.set_volume(volume)
+            self.voices[index] = (name, self.priorities.get(name, 0), self.frame)
+            self.played += 1
+
+    def stats(self):
+        '''
+        This method returns a dictionary with the counters.
+        '''
+        return {'played': self.played, 'coalesced': self.coalesced,
+                'stolen': self.stolen, 'dropped': self.dropped}
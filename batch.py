@@ -0,0 +1,104 @@
+'''
+
+Description: This program plays many headless games with the hacks bot, spread
+over all the CPU cores, and prints how well the bot did. Every game has its
+own seed so a run can be repeated exactly.
+
+Usage: python batch.py [--games N] [--workers N] [--seed N] [--waves N]
+
+'''
+
+import os
+import time
+import argparse
+import collections
+import concurrent.futures
+import numpy
+import engine
+
+# Result of one game (plain values so it can be sent between processes)
+GameResult = collections.namedtuple('GameResult', 'seed score wave lives frames wall_time')
+
+def playGame(seed, max_waves=0):
+    '''
+    This function plays one headless bot game with the given seed and
+    returns a GameResult.
+    '''
+    result = engine.runHeadless(True, max_waves, seed=seed)
+    scoreKeeper = result.scoreKeeper
+    return GameResult(seed, scoreKeeper.score, scoreKeeper.wave, scoreKeeper.lives,
+                      result.frames, result.wall_time)
+
+def playGames(seeds, max_waves=0):
+    '''
+    This function plays a chunk of games in one worker process (so a worker
+    isn't sent one tiny job at a time).
+    '''
+    return [playGame(seed, max_waves) for seed in seeds]
+
+def evaluate(games, workers=None, first_seed=0, max_waves=0):
+    '''
+    This function plays games games (seeds first_seed, first_seed+1, ...) on
+    workers processes and returns the list of GameResults (in seed order)
+    and the wall time it took.
+    workers : number of processes, None for one per core, 1 to play in this
+              process.
+    '''
+    seeds = list(range(first_seed, first_seed + games))
+    start = time.perf_counter()
+    if workers == 1:
+        results = playGames(seeds, max_waves)
+    else:
+        workers = workers or os.cpu_count()
+        # About 4 chunks per worker keeps them all busy until the end.
+        size = max(1, games // (workers * 4))
+        chunks = [seeds[i:i + size] for i in range(0, games, size)]
+        results = []
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            for chunk in executor.map(playGames, chunks, [max_waves] * len(chunks)):
+                results.extend(chunk)
+    return results, time.perf_counter() - start
+
+def summarize(values):
+    '''
+    This function returns a dictionary with the mean, percentiles and max of
+    a list of numbers.
+    '''
+    values = numpy.asarray(values)
+    summary = {'mean': float(values.mean())}
+    for percentile in (10, 50, 90, 99):
+        summary[f'p{percentile}'] = float(numpy.percentile(values, percentile))
+    summary['max'] = float(values.max())
+    return summary
+
+def report(results, wall_time):
+    '''
+    This function prints the score and wave distributions and the speed.
+    '''
+    for name in ('score', 'wave'):
+        summary = summarize([getattr(result, name) for result in results])
+        print(f'{name:<6}' + '  '.join(f'{key} {value:.1f}' for key, value in summary.items()))
+    best = max(results, key=lambda result: result.score)
+    print(f'best: score {best.score} wave {best.wave} (seed {best.seed})')
+    frames = sum(result.frames for result in results)
+    print(f'{len(results)} games in {wall_time:.2f} s: {len(results) / wall_time:.1f} games/s, '
+          f'{frames / wall_time:.0f} frames/s')
+
+def main():
+    '''
+    This function reads the command line and runs the batch.
+    '''
+    parser = argparse.ArgumentParser(description='Evaluate the hacks bot over many games.')
+    parser.add_argument('--games', type=int, default=1000, help='number of games to play')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of processes (default: one per core)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--waves', type=int, default=0,
+                        help='stop each game after this wave (default: until the bot loses)')
+    args = parser.parse_args()
+
+    results, wall_time = evaluate(args.games, args.workers, args.seed, args.waves)
+    report(results, wall_time)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,468 @@
+'''
+
+Description: Benchmarks for the hot paths of the game. They run with the SDL
+dummy drivers so no window or sound card is needed.
+
+Every result is a time in microseconds (per call or per frame, see its name).
+Results can be saved as JSON and compared with a stored baseline
+(benchmark_baseline.json), any result slower than the baseline by more than
+the threshold (and by more than the minimum delta, so sub-microsecond noise
+in the fastest results is not reported) is a regression and the exit code
+is 1.
+
+Usage: python benchmark.py [--only GROUP] [--output FILE] [--baseline FILE]
+                           [--save-baseline] [--threshold 0.25]
+                           [--min-delta 3]
+
+'''
+
+import os
+# Must be set before pygame is initialized.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import sys
+import math
+import json
+import time
+import random
+import timeit
+import platform
+import argparse
+import pygame
+import gameSprites
+import engine
+import swarm
+import atlas
+import renderer
+import telemetry
+
+def mousePath(frames):
+    '''
+    This function returns a list of mouse positions that sweep around the
+    player, like a user aiming over the course of a game.
+    '''
+    path = []
+    for frame in range(frames):
+        angle = frame * 0.05
+        path.append((int(320 + 250 * math.cos(angle)), int(240 + 200 * math.sin(angle))))
+    return path
+
+def timeFrames(function, path):
+    '''
+    This function calls function once per mouse position and returns the
+    average time per call in microseconds.
+    '''
+    start = time.perf_counter()
+    for xy_position in path:
+        function(xy_position)
+    return (time.perf_counter() - start) / len(path) * 1e6
+
+def measure(function, number, repeat=9):
+    '''
+    This function calls function number times, repeat times over, and returns
+    the best average time per call in microseconds (the best run has the
+    least noise from other programs).
+    '''
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+def planeWave(count, seed, left=-20, right=2000):
+    '''
+    This function returns random centers, bounces and image variants for
+    count planes spread like a very long wave.
+    '''
+    rng = random.Random(seed)
+    centers = [(rng.randint(left, right), rng.randint(75, 455)) for i in range(count)]
+    bounces = [rng.randint(-3, 3) for i in range(count)]
+    variants = [rng.randrange(2) for i in range(count)]
+    return centers, bounces, variants
+
+def benchAssets(screen):
+    '''
+    This function compares loading every sprite image file one by one with
+    loading the atlas sheet (the atlas check included).
+    '''
+    paths = gameSprites.assets.paths()
+    atlas.load(paths)
+    
+    def files():
+        for path in paths:
+            pygame.image.load(path).convert_alpha()
+    
+    return {'load sprite images one by one': measure(files, 1),
+            'load atlas sheet': measure(lambda: atlas.load(paths), 1)}
+
+def benchRotation(screen, frames=3000):
+    '''
+    This function compares the per-frame cost of rotating the turret without
+    and with the rotation cache.
+    '''
+    path = mousePath(frames)
+    player = gameSprites.Player(screen)
+    center = player.rect.center
+    image = player.original_image
+    
+    def uncached(xy_position):
+        degrees = gameSprites.find_angle(center, xy_position)
+        pygame.transform.rotate(image, degrees)
+    
+    results = {}
+    results['rotate without cache (per frame)'] = timeFrames(uncached, path)
+    for step in (1, 2):
+        gameSprites.rotations.set_step(step)
+        # First pass fills the cache, second pass is the steady state.
+        results[f'Player.rotate cold cache, step {step} (per frame)'] = timeFrames(player.rotate, path)
+        results[f'Player.rotate warm cache, step {step} (per frame)'] = timeFrames(player.rotate, path)
+    gameSprites.rotations.set_step(1)
+    return results
+
+def benchProjectile(screen):
+    '''
+    This function times aiming a new missile: Projectile.set_speed and
+    Projectile.rotate towards targets all around the player.
+    '''
+    path = mousePath(360)
+    missile = gameSprites.Projectile(screen, (81, 240))
+    targets = iter(path * 1000)
+    
+    def setSpeed():
+        missile.rect.center = (81, 240)
+        missile.dx = 20
+        missile.set_speed(next(targets))
+    
+    def rotate():
+        missile.rotate(next(targets))
+    
+    return {'Projectile.set_speed (per call)': measure(setSpeed, 2000),
+            'Projectile.rotate (per call)': measure(rotate, 2000)}
+
+def benchPlane(screen, count=1000):
+    '''
+    This function times Plane.update for a group of sprites (the sprite
+    planes are still used outside the game loop).
+    '''
+    centers, bounces, variants = planeWave(count, 1)
+    group = pygame.sprite.Group([gameSprites.Plane(screen, center, 5, bounce)
+                                 for center, bounce in zip(centers, bounces)])
+    return {f'Plane.update ({count} planes, per frame)': measure(group.update, 20)}
+
+def benchExplosion(screen):
+    '''
+    This function times making an explosion (new and from the pool) and
+    playing it to the end.
+    '''
+    pool = gameSprites.SpritePool(gameSprites.Explosion)
+    
+    def construct():
+        gameSprites.Explosion((100, 100), 0)
+    
+    def acquire():
+        pool.acquire((100, 100), 0).kill()
+    
+    def lifetime():
+        group = pygame.sprite.Group(gameSprites.Explosion((100, 100), 0))
+        while group:
+            group.update()
+    
+    return {'Explosion() (per call)': measure(construct, 1000),
+            'SpritePool.acquire explosion (per call)': measure(acquire, 1000),
+            'Explosion.update (whole explosion)': measure(lifetime, 200)}
+
+def benchScoreKeeper(screen):
+    '''
+    This function times ScoreKeeper.update when nothing changed and when
+    the score changes every frame.
+    '''
+    scoreKeeper = gameSprites.ScoreKeeper(screen)
+    
+    def changing():
+        scoreKeeper.add_score(5)
+        scoreKeeper.update()
+    
+    return {'ScoreKeeper.update (unchanged)': measure(scoreKeeper.update, 5000),
+            'ScoreKeeper.update (new score)': measure(changing, 1000)}
+
+def benchSpawn(screen):
+    '''
+    This function times spawning a whole wave like the game does, for an
+    early wave and for wave 30.
+    '''
+    results = {}
+    for wave in (1, 30):
+        world = engine.GameWorld(screen, False, seed=wave)
+        
+        def spawn():
+            world.increase_plane = wave
+            world.planes.kill(world.planes.first(len(world.planes)))
+            world.arrivals = []
+            world.spawn_wave()
+        
+        results[f'spawn_wave (wave {wave})'] = measure(spawn, 200)
+    return results
+
+def benchCollide(screen, counts=(10, 100, 1000, 10000)):
+    '''
+    This function times each collision check of the game loop (missile,
+    player and the three endzones) for several numbers of planes.
+    '''
+    world = engine.GameWorld(screen, False)
+    rects = (('missile', pygame.Rect(300, 200, 33, 14)), ('player', world.player.rect),
+             ('left endzone', world.leftEndzone.rect), ('top endzone', world.topEndzone.rect),
+             ('bottom endzone', world.bottomEndzone.rect))
+    results = {}
+    for count in counts:
+        centers, bounces, variants = planeWave(count, count)
+        planes = swarm.PlaneSwarm(screen)
+        planes.spawn(centers, 5, bounces, variants)
+        for name, rect in rects:
+            results[f'collide {name} ({count} planes)'] = measure(lambda: planes.collide_rect(rect), 200)
+    return results
+
+def benchSwarm(screen, counts=(100, 1000, 10000), frames=60):
+    '''
+    This function compares the per-frame cost (move, bounce, the endzone,
+    player and missile collision checks and drawing) of one Sprite per plane
+    against the vectorized PlaneSwarm, for several numbers of planes.
+    '''
+    world = engine.GameWorld(screen, False)
+    rects = [world.leftEndzone.rect, world.topEndzone.rect, world.bottomEndzone.rect,
+             world.player.rect, pygame.Rect(300, 200, 33, 14)]
+    results = {}
+    for count in counts:
+        # Spread the planes over the screen (nothing reaches the left endzone)
+        centers, bounces, variants = planeWave(count, count, 100, 600)
+        
+        group = pygame.sprite.Group([gameSprites.Plane(screen, center, 0, bounce)
+                                     for center, bounce in zip(centers, bounces)])
+        start = time.perf_counter()
+        for frame in range(frames):
+            for rect in rects:
+                probe = pygame.sprite.Sprite()
+                probe.rect = rect
+                pygame.sprite.spritecollide(probe, group, False)
+            group.update()
+            group.draw(screen)
+        results[f'Sprite planes ({count}, per frame)'] = (time.perf_counter() - start) / frames * 1e6
+        
+        planes = swarm.PlaneSwarm(screen)
+        planes.spawn(centers, 0, bounces, variants)
+        start = time.perf_counter()
+        for frame in range(frames):
+            for rect in rects:
+                planes.collide_rect(rect)
+            planes.update()
+            planes.draw(screen)
+        results[f'PlaneSwarm ({count}, per frame)'] = (time.perf_counter() - start) / frames * 1e6
+    return results
+
+def benchCollisions(screen, counts=(10, 100, 1000, 10000, 50000), frames=20):
+    '''
+    This function runs the game's five collision checks (missile, player and
+    the left, top and bottom endzones) plus the plane movement every frame,
+    using sprite groups and the swarm's vectorized test. It makes sure both
+    find exactly the same planes and returns the time per frame of each.
+    '''
+    world = engine.GameWorld(screen, False)
+    missile = pygame.sprite.Sprite()
+    missile.rect = pygame.Rect(300, 200, 33, 14)
+    probes = [missile, world.player, world.leftEndzone, world.topEndzone, world.bottomEndzone]
+    results = {}
+    for count in counts:
+        centers, bounces, variants = planeWave(count, count)
+        
+        # Sprite version (what game() did before the swarm)
+        planes = []
+        for center, bounce, variant in zip(centers, bounces, variants):
+            plane = gameSprites.Plane(screen, center, 5, bounce)
+            plane.image = gameSprites.assets.planes()[variant]
+            plane.rect = plane.image.get_rect(center=center)
+            planes.append(plane)
+        order = dict((plane, index) for index, plane in enumerate(planes))
+        group = pygame.sprite.Group(planes)
+        expected = []
+        start = time.perf_counter()
+        for frame in range(frames):
+            for probe in probes:
+                collision = pygame.sprite.spritecollide(probe, group, False)
+                if probe in (world.topEndzone, world.bottomEndzone):
+                    for plane in collision:
+                        plane.change_directionY()
+                expected.append(sorted(order[plane] for plane in collision))
+            group.update()
+        results[f'spritecollide ({count}, per frame)'] = (time.perf_counter() - start) / frames * 1e6
+        
+        # Swarm version
+        planes = swarm.PlaneSwarm(screen)
+        planes.spawn(centers, 5, bounces, variants)
+        found = []
+        start = time.perf_counter()
+        for frame in range(frames):
+            for probe in probes:
+                collision = planes.collide_rect(probe.rect)
+                if probe in (world.topEndzone, world.bottomEndzone):
+                    planes.change_directionY(collision)
+                found.append(collision)
+            planes.update()
+        results[f'vectorized ({count}, per frame)'] = (time.perf_counter() - start) / frames * 1e6
+        assert [hits.tolist() for hits in found] == expected
+    return results
+
+def benchIntercept(screen, counts=(10, 100, 1000, 5000)):
+    '''
+    This function times the bot's intercept solver (predicting every plane
+    and checking the best shots) for several numbers of planes. It runs once
+    per missile, not every frame.
+    '''
+    results = {}
+    for count in counts:
+        world = engine.GameWorld(screen, True, seed=1)
+        centers, bounces, variants = planeWave(count, count, 100, 1600)
+        world.planes.spawn(centers, 5, bounces, variants)
+        results[f'InterceptSolver.solve ({count} planes)'] = measure(lambda: world.solver.solve(world), 10)
+    return results
+
+def benchRender(screen, frames=600):
+    '''
+    This function plays the same bot game twice, drawing it with the full
+    redraw renderer and with the dirty rect renderer (at alphas 0.25, 0.5,
+    0.75 and 1 in turn, like frames drawn between steps). It checks that
+    every frame looks exactly the same and returns the time per frame of
+    each.
+    '''
+    background = pygame.image.load('images/background.png').convert()
+    results = {}
+    pictures = {}
+    for name, rendererClass in (('full redraw', renderer.FullRenderer),
+                                ('dirty rects', renderer.DirtyRenderer)):
+        world = engine.GameWorld(screen, True, seed=7)
+        gameRenderer = rendererClass(screen, background)
+        total = 0
+        pictures[name] = []
+        for frame in range(frames):
+            world.step()
+            alpha = (frame % 4 + 1) / 4
+            start = time.perf_counter()
+            if world.moved:
+                gameRenderer.render(world, alpha=alpha)
+            else:
+                gameRenderer.render(world, (320, 240), alpha)
+            total += time.perf_counter() - start
+            pictures[name].append(hash(pygame.image.tobytes(screen, 'RGB')))
+        results[f'{name} (per frame)'] = total / frames * 1e6
+    assert pictures['full redraw'] == pictures['dirty rects']
+    return results
+
+def benchTelemetry(screen, count=1000, frames=300):
+    '''
+    This function times packing the state of a frame for the telemetry
+    stream next to a game step, both with count planes on the screen.
+    '''
+    world = engine.GameWorld(screen, True, seed=3)
+    centers, bounces, variants = planeWave(count, count, 100, 640)
+    world.planes.spawn(centers, 1, bounces, variants)
+    sink = telemetry.TelemetryWriter(os.devnull, screen.get_size())
+    
+    # The planes are all alive before the steps
+    record = measure(lambda: sink.record(world), frames)
+    sink.close()
+    step = measure(world.step, frames, 1)
+    return {f'GameWorld.step ({count} planes)': step,
+            f'TelemetryWriter.record ({count} planes)': record}
+
+# Every group of benchmarks, in the order they run
+BENCHMARKS = [('assets', benchAssets),
+              ('rotation', benchRotation),
+              ('projectile', benchProjectile),
+              ('plane', benchPlane),
+              ('explosion', benchExplosion),
+              ('scorekeeper', benchScoreKeeper),
+              ('spawn', benchSpawn),
+              ('collide', benchCollide),
+              ('swarm', benchSwarm),
+              ('broadphase', benchCollisions),
+              ('intercept', benchIntercept),
+              ('render', benchRender),
+              ('telemetry', benchTelemetry)]
+
+def runBenchmarks(only=None):
+    '''
+    This function runs the benchmarks (only the groups named in only, if
+    given) and returns a dictionary of 'group/name' to microseconds.
+    '''
+    pygame.init()
+    screen = pygame.display.set_mode((640, 480))
+    gameSprites.assets.preload()
+    
+    results = {}
+    for group, function in BENCHMARKS:
+        if only and group not in only:
+            continue
+        for name, value in function(screen).items():
+            results[f'{group}/{name}'] = value
+            print(f'{group + "/" + name:<60}{value:>12.2f} us')
+    return results
+
+def compare(results, baseline, threshold, min_delta=3.0):
+    '''
+    This function prints how every result compares to the baseline and
+    returns the names of the ones that got slower by more than threshold
+    (0.25 = 25% slower) and by more than min_delta microseconds.
+    '''
+    regressions = []
+    print(f'\n{"benchmark":<60}{"baseline":>12}{"now":>12}{"change":>9}')
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        change = value / baseline[name] - 1
+        marker = ''
+        if change > threshold and value - baseline[name] > min_delta:
+            regressions.append(name)
+            marker = '  <-- slower'
+        print(f'{name:<60}{baseline[name]:>12.2f}{value:>12.2f}{change:>+9.0%}{marker}')
+    return regressions
+
+def main():
+    '''
+    This function reads the command line, runs the benchmarks, saves the
+    results and compares them with the baseline.
+    '''
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of the game.')
+    parser.add_argument('--only', action='append', metavar='GROUP',
+                        choices=[group for group, function in BENCHMARKS],
+                        help='only run this group (can be given more than once)')
+    parser.add_argument('--output', metavar='FILE', help='save the results as JSON')
+    parser.add_argument('--baseline', metavar='FILE', default='benchmark_baseline.json',
+                        help='results to compare with (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='save these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='slowdown reported as a regression (default: %(default)s)')
+    parser.add_argument('--min-delta', type=float, default=3.0, metavar='US',
+                        help='slowdowns of fewer microseconds are never regressions '
+                             '(default: %(default)s)')
+    args = parser.parse_args()
+    
+    results = runBenchmarks(args.only)
+    pygame.quit()
+    
+    report = {'unit': 'us', 'python': platform.python_version(),
+              'pygame': pygame.version.ver, 'machine': platform.machine(),
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=1)
+        return
+    
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%}')
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
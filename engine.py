@@ -0,0 +1,571 @@
+'''
+
+Description: This module holds the game simulation (waves, collisions,
+scoring and the hacks bot) so it can be run inside the window by main.py, or
+headless as fast as the CPU allows.
+
+Usage: python engine.py [waves]
+
+'''
+
+import os
+import sys
+import time
+import heapq
+import random
+import collections
+import pygame
+import gameSprites
+import swarm
+import intercept
+import profiler as frameProfiler
+
+# Everything the player can do in a single frame.
+# up, down : W and S keys
+# fire : left mouse button
+# position : (x, y) of the mouse
+FrameInput = collections.namedtuple('FrameInput', 'up down fire position')
+
+# Input used when nobody is playing (headless runs with hacks on).
+NO_INPUT = FrameInput(False, False, False, (0, 0))
+
+# What a headless run returns.
+HeadlessResult = collections.namedtuple('HeadlessResult',
+                                        'scoreKeeper frames wall_time')
+
+# Everything needed to draw a game after one step, made by
+# GameWorld.snapshot() and never changed afterwards, so it can be drawn on
+# another thread while the next steps run (see pipeline.py).
+# step : the number of steps simulated when it was made
+# sprites : (image, rect, center before the step or None) of every sprite,
+#           in drawing order
+# player : the player's entry in sprites
+# planes : PlaneSwarm.state()
+# loaded : True while the turret is loaded (the aiming line is drawn)
+# score, lives, wave : the values shown at the top of the window
+# lost : True when the player has no lives left
+Snapshot = collections.namedtuple('Snapshot', 'step sprites player planes loaded '
+                                              'score lives wave lost')
+
+# Extra pixels right of the screen (besides how far planes fly while the
+# bot's missile does) where planes of a wave are already in the swarm.
+ARRIVAL_MARGIN = 64
+
+# Simulation steps per second. Every speed and timer in the game counts
+# steps (planes move 5+ pixels a step, the missile reloads in 15 steps ...).
+STEP_RATE = 30
+
+class FixedTimestep(object):
+    '''
+    This class decides how many simulation steps to run each rendered frame,
+    so the game always runs at STEP_RATE steps per second no matter how fast
+    it is drawn. The time left over is kept for the next frame, and alpha()
+    says how far the drawing is between the last step and the next one.
+    '''
+    def __init__(self, rate=STEP_RATE, max_steps=5):
+        '''
+        This initializer takes 2 parameters:
+        rate : simulation steps per second.
+        max_steps : the most steps run in one frame. If the computer is too
+                    slow to keep up, the game slows down instead of running
+                    more and more steps to catch up (the spiral of death).
+        '''
+        self.step_time = 1 / rate
+        self.max_steps = max_steps
+        # Time not simulated yet (always less than one step after advance())
+        self.accumulator = 0.0
+        self.last = None
+        # Seconds of simulation dropped because of max_steps
+        self.dropped = 0.0
+
+    def reset(self):
+        '''
+        This method forgets the time since the last frame (used after the game
+        was paused). The next frame runs one step.
+        '''
+        self.last = None
+        self.accumulator = 0.0
+
+    def advance(self):
+        '''
+        This method adds the time since the last call and returns the number
+        of steps to run now.
+        '''
+        now = time.perf_counter()
+        if self.last is None:
+            elapsed = self.step_time
+        else:
+            elapsed = now - self.last
+        self.last = now
+        self.accumulator += elapsed
+
+        steps = int(self.accumulator / self.step_time)
+        if steps > self.max_steps:
+            # Drop the time that cannot be caught up
+            steps = self.max_steps
+            self.dropped += self.accumulator - self.step_time * steps
+            self.accumulator = self.step_time * steps
+        self.accumulator -= self.step_time * steps
+        return steps
+
+    def alpha(self):
+        '''
+        This method returns how far the current time is between the last step
+        and the next one (0 to 1).
+        '''
+        return min(self.accumulator / self.step_time, 1.0)
+
+class GameWorld(object):
+    '''
+    This class holds every sprite and variable of one game and advances it
+    one frame at a time. It never draws, plays sounds, or reads the keyboard
+    and mouse itself, that is left to whoever calls step().
+    '''
+    def __init__(self, screen, hacks, seed=None, profiler=None):
+        '''
+        This initializer takes 4 parameters:
+        screen : the pygame surface the game is played on (only its size is
+                 used by the simulation).
+        hacks : a bool value, True lets the computer play.
+        seed : seed for this game's random numbers. The same seed and the
+               same inputs always play the same game. None picks one.
+        profiler : a FrameProfiler timing each phase of step() (None for a
+                   disabled one).
+        '''
+        self.screen = screen
+        self.hacks = hacks
+        if profiler is None:
+            profiler = frameProfiler.FrameProfiler()
+        self.profiler = profiler
+
+        # Every random number of the game comes from its own generator.
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Set up endzones that are outside of the screen.
+        self.leftEndzone = gameSprites.EndZone(screen, -screen.get_width(), 0, False)
+        self.rightEndzone = gameSprites.EndZone(screen, screen.get_width(), 0, False)
+        self.topEndzone = gameSprites.EndZone(screen, 0, 0, True)
+        self.bottomEndzone = gameSprites.EndZone(screen, 0, screen.get_height(), True)
+
+        self.player = gameSprites.Player(screen)
+        self.missile = gameSprites.Projectile(screen, (-30, 10))
+        self.crosshair = gameSprites.Crosshair()
+        self.scoreKeeper = gameSprites.ScoreKeeper(screen)
+        self.waveLabel = gameSprites.WaveLabel(self.scoreKeeper.wave+1)
+
+        # Missile sprite group to check for all missiles on the screen.
+        self.missileSprites = pygame.sprite.Group()
+
+        # Endzone group to check for collision
+        self.endzoneSprites = pygame.sprite.Group(self.leftEndzone, \
+                                                  self.rightEndzone, \
+                                                  self.topEndzone, \
+                                                  self.bottomEndzone)
+
+        # Every plane is stored in one vectorized swarm instead of sprites.
+        self.planes = swarm.PlaneSwarm(screen)
+        # Aims the missile when hacks are on
+        self.solver = intercept.InterceptSolver(screen)
+        # Planes of the wave still far right of the screen, added to the
+        # swarm shortly before they get there. A heap of
+        # (step, order, center, x_speed, bounce, variant) by the step they
+        # are added at (order keeps the spawn order for the same step).
+        self.arrivals = []
+        self.arrivalOrder = 0
+
+        # Add them to allSprites group to display.
+        self.allSprites = pygame.sprite.LayeredUpdates(self.player, \
+                                                       self.crosshair, \
+                                                       self.scoreKeeper)
+
+        # This variable is used to make sure it only takes the position of the
+        # first mouse click.
+        self.moved = False
+        # speed_up modifies the speed of the plane as the wave increases
+        self.speed_up = 0
+        # Time gives a 2 second pause before starting the next wave.
+        self.timer = 60
+        # Add planes (in increments of 100) by increasing the x coord range
+        self.increase_plane = 0
+        # This sets up the reload speed for the rocket (15 frames = 0.5 seconds)
+        self.reload = 15
+
+        # Names of the sounds that should be played for the last frame
+        # ('missile' or 'plane').
+        self.sounds = []
+        # Number of frames simulated so far.
+        self.frames = 0
+        # Planes destroyed by the missile or the tank so far.
+        self.kills = 0
+        # Becomes True when the player has no lives left.
+        self.lost = False
+        # Where the bot last fired (the turret keeps pointing there).
+        self.aim = None
+        # (sprite, center) of the moving sprites before the last step, to
+        # draw them between two steps.
+        self.previous = []
+
+    def explode(self, xy_pos, explosionType, sound):
+        '''
+        This method adds an explosion at xy_pos and queues its sound.
+        '''
+        self.sounds.append(sound)
+        explosion = gameSprites.explosions.acquire(xy_pos, explosionType)
+        self.allSprites.add(explosion)
+
+    def fire(self, target):
+        '''
+        This method shoots a missile from the player towards target.
+        '''
+        # Change player image to already shot.
+        self.player.shoot()
+
+        # Set up missile sprite (reusing a killed one).
+        self.missile = gameSprites.projectiles.acquire(self.screen, self.player.rect.center)
+        self.missile.set_speed(target)
+        self.missile.rotate(target)
+
+        # Add the missile sprite to display + update
+        self.allSprites.add(self.missile)
+        self.missileSprites.add(self.missile)
+
+        self.moved = True
+
+    def bot_target(self):
+        '''
+        This method returns the point the computer fires at when hacks are
+        on: where the missile meets the planes so that it destroys the most
+        of them (see intercept.py).
+        '''
+        self.aim, kills = self.solver.solve(self)
+        return self.aim
+
+    def spawn_wave(self):
+        '''
+        This method adds the next wave of planes.
+        '''
+        screen = self.screen
+        centers = []
+        bounces = []
+        variants = []
+        for x in range(screen.get_width(), screen.get_width()+1000+\
+                       self.increase_plane*50, 100):
+            # Make the planes bounce up and down after it reaches third
+            # wave
+            if self.scoreKeeper.wave >= 3:
+                bounce = self.rng.randint(-3, 3)
+            else:
+                bounce = 0
+            # Generate random spawning y-coordinates
+            y = self.rng.randint(75, screen.get_height() - 25)
+            centers.append((x, y))
+            bounces.append(bounce)
+            # Pick one of the two plane images
+            variants.append(self.rng.randrange(2))
+        x_speed = 5+self.speed_up//2
+        self.speed_up += 1
+        self.increase_plane += 1
+
+        # Set maximum speed up
+        if self.speed_up > 10:
+            self.speed_up = 10
+
+        self.add_planes(centers, x_speed, bounces, variants)
+
+    def add_planes(self, centers, x_speed, bounces, variants):
+        '''
+        This method adds planes to the game: the ones close to the screen go
+        in the swarm now and the rest are queued in arrivals.
+        centers : a list of the (x, y) center of each plane.
+        x_speed : pixels every plane moves left each step.
+        bounces, variants : a list of each plane's y speed and image.
+        '''
+        screen = self.screen
+        # Only planes close to the screen go in the swarm now. Far planes
+        # cannot be hit, bounced or aimed at (the bot looks as far ahead as
+        # its missile flies), and they do not move up or down before they
+        # are on the screen, so they are added later exactly where they
+        # would have been.
+        limit = screen.get_width() + ARRIVAL_MARGIN + (self.solver.horizon + 1) * x_speed
+        now = ([], [], [])
+        for (x, y), bounce, variant in zip(centers, bounces, variants):
+            # Steps until it is within the limit
+            steps = max(0, -(-(x - limit) // x_speed))
+            if not steps:
+                now[0].append((x, y))
+                now[1].append(bounce)
+                now[2].append(variant)
+                continue
+            heapq.heappush(self.arrivals, (self.frames + steps, self.arrivalOrder,
+                                           (x - steps * x_speed, y), x_speed, bounce, variant))
+            self.arrivalOrder += 1
+        if now[0]:
+            self.planes.spawn(now[0], x_speed, now[1], now[2])
+
+    def arrive(self):
+        '''
+        This method adds the planes whose time has come to the swarm.
+        '''
+        arrivals = self.arrivals
+        centers = []
+        speeds = []
+        bounces = []
+        variants = []
+        while arrivals and arrivals[0][0] <= self.frames:
+            step, order, center, x_speed, bounce, variant = heapq.heappop(arrivals)
+            centers.append(center)
+            speeds.append(x_speed)
+            bounces.append(bounce)
+            variants.append(variant)
+        if centers:
+            self.planes.spawn(centers, speeds, bounces, variants)
+
+    def step(self, inputs=NO_INPUT):
+        '''
+        This method advances the game by one frame.
+        inputs : a FrameInput with the keys and mouse for this frame (ignored
+                 except for the crosshair when hacks are on).
+        '''
+        self.sounds = []
+        self.frames += 1
+        if self.arrivals:
+            self.arrive()
+        self.previous = [(sprite, sprite.rect.center) for sprite in self.missileSprites]
+        self.previous.append((self.player, self.player.rect.center))
+        player = self.player
+        planes = self.planes
+        scoreKeeper = self.scoreKeeper
+        profiler = self.profiler
+
+        if self.hacks:
+            # Auto move
+            if planes:
+                distance = planes.center(planes.first()[0])[1] - player.rect.centery
+                if abs(distance) < 10:
+                    pass
+                elif distance > 0:
+                    player.move(10)
+                elif distance < 0:
+                    player.move(-10)
+        else:
+            # Move player using keys W and S
+            if inputs.up:
+                player.move(-10)
+            if inputs.down:
+                player.move(10)
+
+        # Set position of crosshair
+        self.crosshair.set_position(inputs.position)
+
+        if self.hacks:
+            # Shoot missile whenever possible with hacks on (auto aim)
+            if not self.moved and planes:
+                self.fire(self.bot_target())
+        else:
+            # Check if mouse click to shoot missile.
+            if inputs.fire and not self.moved:
+                self.fire(inputs.position)
+        profiler.mark('bot')
+
+        # Check for collision of missile with planes (only the first missile
+        # that hits anything counts).
+        for missile in self.missileSprites:
+            collision = planes.collide_rect(missile.rect)
+            if len(collision):
+                for plane in collision:
+                    scoreKeeper.add_score(10)
+                    self.explode(planes.center(plane), 0, 'missile')
+                # Kill each plane.
+                planes.kill(collision)
+                self.kills += len(collision)
+                # Kill the missile
+                missile.kill()
+                missile.set_position((-30, 10))
+                break
+
+        # Check for collision of player with planes.
+        collision = planes.collide_rect(player.rect)
+        for plane in collision:
+            scoreKeeper.add_score(5)
+            self.explode(planes.center(plane), 0, 'missile')
+        # Kill each plane.
+        planes.kill(collision)
+        self.kills += len(collision)
+
+        # Check for collision of planes with left endzone
+        collision = planes.collide_rect(self.leftEndzone.rect)
+        for plane in collision:
+            # Subtract life from player
+            scoreKeeper.subtract_life()
+            self.explode(planes.center(plane), 1, 'plane')
+        # Kill each plane.
+        planes.kill(collision)
+
+        # Check for collision of planes with top and bottom endzones and
+        # reverse their y-direction.
+        planes.change_directionY(planes.collide_rect(self.topEndzone.rect))
+        planes.change_directionY(planes.collide_rect(self.bottomEndzone.rect))
+
+        # Check for collision of missile with endzone
+        collision = pygame.sprite.groupcollide(self.missileSprites, self.endzoneSprites, True, False)
+        if collision:
+            # Get the missile object that collided with the endzone
+            missile = list(collision)[0]
+            self.explode(missile.rect.center, 0, 'missile')
+            missile.kill()
+        profiler.mark('collisions')
+
+        # If all planes are destroyed, one wave is completed
+        if not planes and not self.arrivals:
+            self.timer -= 1
+            self.allSprites.add(self.waveLabel)
+            self.allSprites.move_to_front(self.waveLabel)
+            # If 2 seconds are up.
+            if not self.timer:
+                self.waveLabel.kill()
+                # Add one to wave number
+                scoreKeeper.add_wave()
+                self.waveLabel.add_wave()
+                self.spawn_wave()
+                # Reset timer.
+                self.timer = 60
+        profiler.mark('spawn')
+
+        # Set up reload speed.
+        if self.moved:
+            self.reload -= 1
+            if self.reload == 0:
+                self.moved = False
+                player.reload()
+                self.reload = 15
+
+        if scoreKeeper.check_lose():
+            self.lost = True
+
+        if self.hacks:
+            # Keep the turret pointed where it last fired
+            if planes and self.aim:
+                player.rotate(self.aim)
+        else:
+            # Get x and y coordinates of mouse to rotate turret in correct direction
+            player.rotate(inputs.position)
+
+        self.allSprites.update()
+        planes.update()
+        profiler.mark('update')
+
+    def interpolate(self, alpha):
+        '''
+        This method moves the player and missile alpha of the way from where
+        they were before the last step to where they are now, and returns
+        what restore() needs to put them back. Only used for drawing.
+        '''
+        moved = []
+        if alpha >= 1:
+            return moved
+        for sprite, (x, y) in self.previous:
+            if sprite.alive():
+                center = sprite.rect.center
+                moved.append((sprite, center))
+                sprite.rect.center = (round(x + (center[0] - x) * alpha),
+                                      round(y + (center[1] - y) * alpha))
+        return moved
+
+    def restore(self, moved):
+        '''
+        This method undoes interpolate().
+        '''
+        for sprite, center in moved:
+            sprite.rect.center = center
+
+    def snapshot(self):
+        '''
+        This method returns a Snapshot of the game as it is now.
+        '''
+        previous = dict(self.previous)
+        sprites = []
+        player = None
+        for sprite in self.allSprites.sprites():
+            entry = (sprite.image, sprite.rect.copy(), previous.get(sprite))
+            if sprite is self.player:
+                player = entry
+            sprites.append(entry)
+        scoreKeeper = self.scoreKeeper
+        return Snapshot(self.frames, tuple(sprites), player, self.planes.state(),
+                        not self.moved, scoreKeeper.score, scoreKeeper.lives,
+                        scoreKeeper.wave, self.lost)
+
+    def draw(self, screen, background, alpha=1.0):
+        '''
+        This method draws the current frame onto screen.
+        alpha : how far between the last two steps to draw the planes (1
+                draws them where they are now). The sprites are moved with
+                interpolate() by the caller.
+        '''
+        self.allSprites.clear(screen, background)
+        screen.blit(background, (0, 0))
+        self.planes.draw(screen, alpha)
+        self.allSprites.draw(screen)
+
+def initHeadless(size=(640, 480)):
+    '''
+    This function starts pygame with the SDL dummy video and audio drivers and
+    returns a display surface, so sprites can be converted without a window.
+    '''
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    # A real display might already be open in this process.
+    if pygame.display.get_init() and pygame.display.get_driver() != 'dummy':
+        pygame.display.quit()
+    pygame.init()
+    # Reuse the surface when running many games in one process.
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != size:
+        screen = pygame.display.set_mode(size)
+    gameSprites.assets.preload()
+    return screen
+
+def runHeadless(hacks=True, max_waves=0, max_frames=0, seed=None):
+    '''
+    This function plays a whole game without drawing, sound, or frame pacing
+    and returns a HeadlessResult.
+    hacks : True lets the bot play, False means nobody plays.
+    max_waves : stop once this wave has been cleared (0 for no limit).
+    max_frames : stop after this many frames (0 for no limit).
+    seed : the game's seed, the same seed always plays the same game (None
+           picks one).
+    '''
+    screen = initHeadless()
+    world = GameWorld(screen, hacks, seed)
+
+    start = time.perf_counter()
+    while not world.lost:
+        # Stop once the last wave has been cleared
+        if max_waves and world.scoreKeeper.wave >= max_waves and not world.planes \
+           and not world.arrivals:
+            break
+        if max_frames and world.frames >= max_frames:
+            break
+        world.step()
+    wall_time = time.perf_counter() - start
+
+    return HeadlessResult(world.scoreKeeper, world.frames, wall_time)
+
+def main():
+    '''
+    This function runs one headless bot game and prints the result.
+    '''
+    max_waves = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    result = runHeadless(True, max_waves)
+    scoreKeeper = result.scoreKeeper
+    print(f'Wave: {scoreKeeper.wave} Score: {scoreKeeper.score} Lives: {scoreKeeper.lives}')
+    print(f'{result.frames} frames in {result.wall_time:.2f} s '
+          f'({result.frames / result.wall_time:.0f} frames/s)')
+    print(f'Missiles: {gameSprites.projectiles.stats()} '
+          f'Explosions: {gameSprites.explosions.stats()}')
+
+if __name__ == '__main__':
+    main()
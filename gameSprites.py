@@ -1,517 +1,873 @@
-'''
-
-By: Mark Xue
-
-Date: May 1, 2019
-
-Description: This is a tower defense game module
-
-For the complete verison (v2.0.0)
-
-'''
-
-import pygame
-import random
-import math
-
-class Player(pygame.sprite.Sprite):
-    '''
-    This class defines the sprite for the player
-    '''
-    def __init__(self, screen):
-        '''
-        This initializer takes a screen surface as a parameter.
-        '''
-        # Call the parent __init__() method
-        pygame.sprite.Sprite.__init__(self)
-         
-        # Loading the full turret and empty turret to have an animation.
-        self.fullTurret = pygame.image.load('images/turret.png').convert_alpha()
-        self.emptyTurret = pygame.image.load('images/emptyTurret.png').convert_alpha()
-
-        
-        # Load ready image and get rect attributes
-        self.image = self.fullTurret
-        self.original_image = self.image
-        self.rect = self.image.get_rect()
-        
-        # 60 pixels right of endzone and centered.
-        self.rect.left = 60
-        self.rect.centery = screen.get_height() // 2
-        
-        self.screen = screen
-    
-    def rotate(self, xy_pos):
-        '''
-        This method will rotate the image based off the mouse's position.
-        The arguements required are the mouse's x and y position
-        This method is the same as the projectile's rotate method.
-        '''
-        # Get the x and y position from the tuple
-        x_pos, y_pos = xy_pos
-        
-        x_distance = x_pos-self.rect.centerx
-        y_distance = self.rect.centery-y_pos
-        
-        # Used to keep the image in its position.
-        original_center = self.rect.center
-        
-        # Unknown reason why, but when x is negative, y_distance must flip
-        # to get the correct image.
-        if x_distance < 0:
-            # Inverse tan of y/x
-            rotate_degrees = math.atan(-y_distance / x_distance)
-            # Convert to degrees
-            rotate_degrees = math.degrees(rotate_degrees)
-            rotate_degrees = 180-rotate_degrees
-            
-        # Error trapping ZeroDivisionError
-        elif x_distance == 0:
-            if y_distance > 0:
-                rotate_degrees = 90
-            else:
-                rotate_degrees = -90
-        
-        # If x_position is positive
-        else:
-            # Inverse tan of y/x
-            rotate_degrees = math.atan(y_distance/x_distance)
-            # Convert to degrees
-            rotate_degrees = math.degrees(rotate_degrees)
-        
-        # Rotate image based off degrees given
-        self.image = pygame.transform.rotate(self.original_image, rotate_degrees)
-        
-        # Get new rect but keep position
-        self.rect = self.image.get_rect()
-        self.rect.center = original_center
-    
-    def shoot(self):
-        '''
-        This method changes the image to the empty turret after it shoots a
-        missile.
-        '''
-        self.image = self.emptyTurret
-        self.original_image = self.image
-    
-    def reload(self):
-        '''
-        This method reloads the turret after the missile is back and puts the
-        first image back to self.image.
-        '''
-        self.image = self.fullTurret
-        self.original_image = self.image
-        
-    def move(self, y_direction):
-        '''
-        This method will be called to move the player 5 pixels (when the key
-        is pressed down)
-        '''
-        self.rect.centery += y_direction
-    
-    def update(self):
-        '''
-        This method will check to make sure the player doesn't go off screen.
-        '''
-        if self.rect.top <= 60:
-            self.rect.top = 65
-        if self.rect.bottom >= self.screen.get_height() - 10:
-            self.rect.bottom = self.screen.get_height() - 15
-            
-class Plane(pygame.sprite.Sprite):
-    '''
-    This class defines a plane sprite for the enemies trying to get to the
-    left endzone.
-    '''
-    def __init__(self, screen, xy_pos, x_speed, y_speed):
-        '''
-        This initializer method takes 2 parameters:
-        screen : the pygame surface object that will be used to make sure the 
-                 plane only moves after it passes the right side of the screen.
-        xy_pos : a tuple that defines the center of the plane.
-        x_speed : defines self.dx (speed it moves at depending on the wave).
-        y_speed : defines self.dy (up and down bouncing for harder levels).
-        '''
-        # Call the parent __init__() method.
-        pygame.sprite.Sprite.__init__(self)
-        
-        # Load the image
-        planes = [pygame.image.load('images/plane1.png').convert_alpha(), \
-                  pygame.image.load('images/plane2.png').convert_alpha()]
-        self.image = planes[random.randrange(2)]
-        self.rect = self.image.get_rect()
-        
-        self.rect.center = xy_pos
-        
-        self.dx = x_speed
-        self.dy = y_speed
-        
-        self.screen = screen
-        
-    def change_directionY(self):
-        '''
-        This method reverses the y direction when it hits the top or bottom
-        endzone.
-        '''
-        self.dy = -self.dy
-        self.rect.centery -= self.dy
-        
-    def update(self):
-        '''
-        This method will be automatically called to update the position
-        of the plane.
-        '''
-        self.rect.centerx -= self.dx
-        # Make sure only change y direction if passed right side of screen.
-        if self.rect.left < self.screen.get_width():
-            self.rect.centery -= self.dy
-            
-class Crosshair(pygame.sprite.Sprite):
-    '''
-    This class defines a crosshair sprite for the mouse's position.
-    '''
-    def __init__(self):
-        '''
-        This initializer method does not take any parameters.
-        '''
-        # Call the parent __init__() method.
-        pygame.sprite.Sprite.__init__(self)
-        
-        self.image = pygame.image.load('images/crosshair.png').convert_alpha()
-        self.rect = self.image.get_rect()
-    
-    def set_position(self, xy_pos):
-        '''
-        This method changes the position of the crosshair depending on the
-        position of the mouse.
-        '''
-        self.rect.center = xy_pos
-    
-class Projectile(pygame.sprite.Sprite):
-    '''
-    This class defines the projectile sprite for the game.
-    '''
-    def __init__(self, screen, xy_pos):
-        '''
-        This initializer takes the screen and xy_pos as a parameter.
-        xy_pos is the centerx and centery tuple that determines where the 
-        projectile starts.
-        '''
-        # Call the parent __init__() method
-        pygame.sprite.Sprite.__init__(self)
-        
-        # Load the projectile.
-        self.image = pygame.image.load('images/missile.png').convert_alpha()
-        self.rect = self.image.get_rect()
-        
-        self.dx = 20
-        
-        # Set starting position
-        self.rect.center = xy_pos
-        
-        # Save original image to rotate
-        self.original_image = self.image
-        
-        # Save the screen as an instance variable for rotation purposes
-        self.screen = screen
-        
-    def set_position(self, xy_pos):
-        '''
-        This method changes the starting position of the missile.
-        '''
-        self.rect.center = xy_pos
-        
-    def set_speed(self, xy_pos):
-        '''
-        This method will define self.dy and possibly modify self.dx to move the 
-        projectile.
-        '''
-        # Get x and y position from the tuple.
-        x_pos, y_pos = xy_pos
-        
-        # Here we will be using y=mx+b equation. b is not needed since b is 
-        # always the starting value, 0.
-        distance_x = (x_pos - self.rect.centerx)
-        distance_y = (y_pos - self.rect.centery)
-        
-        try:
-            # The slope cannot account for distance x's direction, only y.
-            slope = distance_y/abs(distance_x)
-        except ZeroDivisionError:
-            # If distance_x is 0, then dx should be 0 and only dy should be moving.
-            if distance_y < 0:
-                self.dy = -20
-                self.dx = 0
-            else:
-                self.dy = 20
-                self.dx = 0
-            return
-        
-        # If the speed is higher than 20, then make the speed a maximum of 20.
-        if slope * self.dx >= 20:
-            self.dx = 20 / slope
-        elif slope * self.dx <= -20:
-            self.dx = -20 / slope
-            
-        # y = slope * x, y=mx
-        self.dy = slope*self.dx
-        
-        # distance_x negative means dx must be negative (but cannot affect the
-        # y=mx equation so its put after).
-        if distance_x < 0:
-            self.dx = -self.dx
-        
-    def rotate(self, xy_pos):
-        '''
-        This method rotates the picture to the correct direction the projectile
-        is going in.
-        '''
-        '''
-        This next snippet is slightly complicated, but it uses trigonometry to
-        find the angle from the projectile to the mouse.
-        tanA = opp/hypo, Therefore tanA = y_distance/x_distance
-        '''
-        # Get the x and y position from the tuple
-        x_pos, y_pos = xy_pos
-        
-        x_distance = x_pos-self.rect.centerx
-        y_distance = self.rect.centery-y_pos
-        
-        # Get original center to keep image in same place.
-        original_center = self.rect.center
-        
-        # Unknown reason why, but when x is negative, y_distance must flip
-        # to get the correct image.
-        if x_distance < 0:
-            # Inverse tan of y/x
-            rotate_degrees = math.atan(-y_distance / x_distance)
-            # Convert to degrees
-            rotate_degrees = math.degrees(rotate_degrees)
-            rotate_degrees = 180-rotate_degrees
-            
-        # Error trapping ZeroDivisionError
-        elif x_distance == 0:
-            if y_distance > 0:
-                rotate_degrees = 90
-            else:
-                rotate_degrees = -90
-        
-        # If x_position is positive
-        else:
-            # Inverse tan of y/x
-            rotate_degrees = math.atan(y_distance/x_distance)
-            # Convert to degrees
-            rotate_degrees = math.degrees(rotate_degrees)
-        
-        # Rotate image based off degrees given
-        self.image = pygame.transform.rotate(self.original_image, rotate_degrees)
-        
-        # Get new rect but keep original position
-        self.rect = self.image.get_rect()
-        self.rect.center = original_center
-        
-    def update(self):
-        '''
-        This method will be called automatically to make the projectile move 
-        forward.
-        '''
-        self.rect.centerx += self.dx
-        self.rect.centery += self.dy
-        
-class Explosion(pygame.sprite.Sprite):
-    '''
-    This class defines an explosion sprite that appears when the missile
-    hits a plane or an endzone.
-    '''
-    def __init__(self, xy_pos, explosionType):
-        '''
-        This initializer method takes in xy_pos as a parameter to determine
-        where the explosion appears
-        explosionType : 0 or 1 defining which type of explosion it is
-        0 being the missile on plane explosion
-        1 being plane on left endzone explosion
-        '''
-        # Call the parent __init__() method
-        pygame.sprite.Sprite.__init__(self)
-        
-        self.images = []
-        if not explosionType:
-            for i in range(23):
-                self.images.append(pygame.image.load(f'images/explosions/Explosion{i}.gif').convert_alpha())
-        else:
-            for i in range(17):
-                self.images.append(pygame.image.load(f'images/planeEffects/effect{i}.png').convert_alpha())            
-        self.imageNum = 0
-        
-        self.image = self.images[self.imageNum]
-        self.rect = self.image.get_rect()
-        self.rect.center = xy_pos
-        
-    def update(self):
-        '''
-        This method will be automatically called to self destruct after explosion
-        ends.
-        '''
-        self.image = self.images[self.imageNum]
-        self.imageNum += 1
-        if self.imageNum == len(self.images):
-            self.kill()
-            
-class EndZone(pygame.sprite.Sprite):
-    '''
-    This class defines an endzone sprite that will be used around the window to
-    detect if anything goes off the screen.
-    '''
-    def __init__(self, screen, x_coord, y_coord, horizontal):
-        '''
-        This initializer takes in 4 parameters
-        screen : the pygame.Surface object used to get width and height
-        x_coord : the left side x coordinate to make the endzone
-        y_coord : the top side y coordinate to make the endzonw
-        horizontal : a bool value, True means its the top or bottom, False means
-                     left or right
-        '''
-        # Call the parent __init__() method
-        pygame.sprite.Sprite.__init__(self)
-        
-        # Create the endzone Surface object
-        if horizontal:
-            # Make this 30 pixels to prevent explosions from touching the 
-            # scorekeeper label.
-            self.image = pygame.Surface((screen.get_width(), 50))
-        else:
-            self.image = pygame.Surface((screen.get_width(), screen.get_height()))
-        
-        self.image = self.image.convert()
-        
-        self.rect = self.image.get_rect()
-        
-        # Set the endzone to the given coordinates
-        self.rect.left = x_coord
-        self.rect.top = y_coord
-
-class ScoreKeeper(pygame.sprite.Sprite):
-    '''
-    This class defines a label sprite to display the score.
-    '''
-    def __init__(self, screen):
-        '''
-        This initializer loads the font "Star Jedi Rounded", and
-        sets the starting score to 0
-        '''
-        # Call the parent __init__() method
-        pygame.sprite.Sprite.__init__(self)
- 
-        # Load our custom font, and initialize the starting score.
-        self.font = pygame.font.Font("fonts/font.ttf", 30)
-        self.score = 0
-        self.lives = 20
-        self.wave = 0
-        
-        # Number of spaces between each value
-        self.spaces = 7
-        
-        self.screen = screen
-        
-    def add_score(self, value):
-        '''
-        This method adds a score for the player when a plane dies.
-        The value parameter is the score they gain.
-        This method will only be called if the plane dies to a missile or by
-        hitting the player.
-        '''
-        self.score += value
-        
-    def subtract_life(self):
-        '''
-        This method subtracts a life from the player.
-        '''
-        self.lives -= 1
-        
-    def add_wave(self):
-        '''
-        This method adds a wave when called.
-        '''
-        self.wave += 1
-        
-    def check_lose(self):
-        '''
-        This method returns a bool value whether the player has lost all their
-        lives or not.
-        '''
-        return self.lives == 0
- 
-    def update(self):
-        '''
-        This method will be called automatically to display the current score,
-        wave, and lives at the top of the game window
-        '''
-        messages = [f"Lives:{self.lives}", f"Wave:{self.wave}", f"Score:{self.score}"]
-        spaces = ' '*self.spaces
-        message = spaces.join(messages)
-        self.image = self.font.render(message, True, (255, 255, 255))
-        self.rect = self.image.get_rect()
-        self.rect.center = (self.screen.get_width()/2, 15)
-        if self.rect.left < 0:
-            self.spaces -= 1
-        elif self.rect.right > self.screen.get_width():
-            self.spaces -= 1
-            
-class WaveLabel(pygame.sprite.Sprite):
-    '''
-    This class defines the large 'wave' label that appears every wave.
-    '''
-    def __init__(self, wave):
-        '''
-        This initializer takes the wave number as a parameter.
-        '''
-        # Call the parent __init__() function
-        pygame.sprite.Sprite.__init__(self)
-        
-        self.font = pygame.font.Font('fonts/font.ttf', 100)
-        
-        self.image = self.font.render(f'Wave {wave}', True, (0, 255, 255))
-        self.rect = self.image.get_rect()
-        self.rect.left = 110
-        self.rect.top = 150
-        
-        # Used to add a wave number.
-        self.wave = wave
-        
-    def add_wave(self):
-        '''
-        This method adds one to the wave number.
-        '''
-        self.wave += 1
-        self.image = self.font.render(f'Wave {self.wave}', True, (0, 255, 255))
-        
-class Label(pygame.sprite.Sprite):
-    '''
-    This class defines a label sprite used to display text on start and end menu.
-    '''
-    def __init__(self, text, size, center=(0, 0), left=0, top=0):
-        '''
-        This initializer method takes 4 parameters
-        center : (x, y) tuple that defines the center of the label
-        text : the string to be displayed
-        size : an integer representing the text size
-        '''
-        # Call the parent __init__() method
-        pygame.sprite.Sprite.__init__(self)
-        
-        self.font = pygame.font.Font('fonts/font.ttf', size)
-        self.text = text
-        self.image = self.font.render(text, True, (0, 255, 255))
-        self.rect = self.image.get_rect()
-        if left and top:
-            self.rect.left = left
-            self.rect.top = top
-        elif center:
-            self.rect.center = center
-        
-    def change_text(self, text):
-        '''
-        This method changes the label's text.
-        '''
-        self.image = self.font.render(text, True, (0, 255, 255))
-        self.text = text
+'''
+
+By: Mark Xue
+
+Date: May 1, 2019
+
+Description: This is a tower defense game module
+
+For the complete verison (v2.0.0)
+
+'''
+
+import pygame
+import random
+import math
+import collections
+import threading
+import atlas
+
+class AssetRegistry(object):
+    '''
+    This class defines a shared store of images so every image file is only
+    loaded and converted once, no matter how many sprites use it.
+    '''
+    def __init__(self):
+        '''
+        This initializer does not take any parameters. Images are loaded the
+        first time they are asked for (or all at once with preload()).
+        '''
+        # Converted surfaces keyed by (path, alpha)
+        self.images = {}
+        # Tuples of animation frames keyed by explosion type
+        self.frameLists = {}
+        
+        # Counters to check how well the cache is doing
+        self.hits = 0
+        self.misses = 0
+        
+    def image(self, path, alpha=True):
+        '''
+        This method returns the surface for the image at path, loading it from
+        disk only the first time.
+        alpha : True to use convert_alpha(), False to use convert()
+        The returned surface is shared, so it must not be drawn on.
+        '''
+        key = (path, alpha)
+        if key in self.images:
+            self.hits += 1
+            return self.images[key]
+        
+        self.misses += 1
+        return self.add(path, pygame.image.load(path), alpha)
+    
+    def add(self, path, surface, alpha=True):
+        '''
+        This method converts surface, already loaded from path (by the
+        background loader), and stores it so image(path) doesn't load it
+        again. It returns the converted surface.
+        '''
+        if alpha:
+            surface = surface.convert_alpha()
+        else:
+            surface = surface.convert()
+        self.images[(path, alpha)] = surface
+        return surface
+    
+    def frame_paths(self, explosionType):
+        '''
+        This method returns the paths of the frames of an explosion.
+        '''
+        if not explosionType:
+            return [f'images/explosions/Explosion{i}.gif' for i in range(23)]
+        return [f'images/planeEffects/effect{i}.png' for i in range(17)]
+    
+    def frames(self, explosionType):
+        '''
+        This method returns a tuple of the frames for an explosion.
+        explosionType : 0 for the missile explosion, 1 for the plane effect
+        (same as the Explosion class).
+        '''
+        if explosionType in self.frameLists:
+            self.hits += 1
+            return self.frameLists[explosionType]
+        
+        self.misses += 1
+        frames = tuple(self.image(path) for path in self.frame_paths(explosionType))
+        self.frameLists[explosionType] = frames
+        return frames
+    
+    def planes(self):
+        '''
+        This method returns both plane images as a tuple.
+        '''
+        return (self.image('images/plane1.png'), self.image('images/plane2.png'))
+    
+    def paths(self):
+        '''
+        This method returns the path of every image used by the sprites.
+        '''
+        return ['images/turret.png', 'images/emptyTurret.png', 'images/missile.png',
+                'images/crosshair.png', 'images/plane1.png', 'images/plane2.png'] + \
+               self.frame_paths(0) + self.frame_paths(1)
+    
+    def load_atlas(self):
+        '''
+        This method takes every sprite image from the atlas sheet (see
+        atlas.py) as a subsurface instead of loading each file. Images that
+        are already loaded are kept.
+        '''
+        self.add_atlas(atlas.load(self.paths()))
+    
+    def add_atlas(self, views):
+        '''
+        This method stores the subsurfaces of the atlas sheet (a dictionary
+        of path to surface, see atlas.py) as the images at those paths.
+        Images that are already loaded are kept.
+        '''
+        for path, view in views.items():
+            self.images.setdefault((path, True), view)
+    
+    def preload(self):
+        '''
+        This method loads every image used by the sprites so nothing has to be
+        loaded from disk in the middle of a game. A display mode must already
+        be set.
+        '''
+        if any((path, True) not in self.images for path in self.paths()):
+            self.load_atlas()
+        for path in self.paths():
+            self.image(path)
+        self.frames(0)
+        self.frames(1)
+        
+    def stats(self):
+        '''
+        This method returns a dictionary with the cache counters.
+        '''
+        return {'images': len(self.images), 'hits': self.hits,
+                'misses': self.misses}
+    
+    def clear(self):
+        '''
+        This method empties the cache and resets the counters.
+        '''
+        self.images.clear()
+        self.frameLists.clear()
+        self.hits = 0
+        self.misses = 0
+
+# Shared registry used by every sprite in this module.
+assets = AssetRegistry()
+
+def find_angle(center, xy_pos):
+    '''
+    This function returns the angle in degrees from center to xy_pos, in the
+    direction pygame.transform.rotate expects (counter-clockwise, 0 = right).
+    It is used to rotate both the player and the projectile.
+    '''
+    '''
+    This next snippet is slightly complicated, but it uses trigonometry to
+    find the angle from the projectile to the mouse.
+    tanA = opp/hypo, Therefore tanA = y_distance/x_distance
+    '''
+    # Get the x and y position from the tuples
+    x_pos, y_pos = xy_pos
+    center_x, center_y = center
+    
+    x_distance = x_pos-center_x
+    y_distance = center_y-y_pos
+    
+    # Unknown reason why, but when x is negative, y_distance must flip
+    # to get the correct image.
+    if x_distance < 0:
+        # Inverse tan of y/x
+        rotate_degrees = math.atan(-y_distance / x_distance)
+        # Convert to degrees
+        rotate_degrees = math.degrees(rotate_degrees)
+        rotate_degrees = 180-rotate_degrees
+        
+    # Error trapping ZeroDivisionError
+    elif x_distance == 0:
+        if y_distance > 0:
+            rotate_degrees = 90
+        else:
+            rotate_degrees = -90
+    
+    # If x_position is positive
+    else:
+        # Inverse tan of y/x
+        rotate_degrees = math.atan(y_distance/x_distance)
+        # Convert to degrees
+        rotate_degrees = math.degrees(rotate_degrees)
+        
+    return rotate_degrees
+
+class RotationCache(object):
+    '''
+    This class stores rotated copies of images so rotating a sprite is a
+    dictionary lookup instead of a new pygame.transform.rotate every frame.
+    Angles are rounded to the nearest multiple of step degrees.
+    '''
+    def __init__(self, step=1):
+        '''
+        This initializer takes the angle step in degrees as a parameter.
+        step : size of each angle bucket, it should divide 360 evenly.
+        '''
+        self.cache = {}
+        self.step = step
+        
+        # Counters to check how well the cache is doing
+        self.hits = 0
+        self.misses = 0
+    
+    def set_step(self, step):
+        '''
+        This method changes the angle step and empties the cache since the old
+        buckets no longer line up.
+        '''
+        self.step = step
+        self.cache.clear()
+        
+    def get(self, surface, degrees):
+        '''
+        This method returns surface rotated by degrees (rounded to the step).
+        Rotated images are made the first time they are asked for.
+        The returned surface is shared, so it must not be drawn on.
+        '''
+        # Work out which bucket this angle falls in.
+        buckets = round(360 / self.step)
+        index = round(degrees / self.step) % buckets
+        key = (surface, index)
+        
+        if key in self.cache:
+            self.hits += 1
+            return self.cache[key]
+        
+        self.misses += 1
+        rotated = pygame.transform.rotate(surface, index * self.step)
+        self.cache[key] = rotated
+        return rotated
+    
+    def precompute(self, surface):
+        '''
+        This method makes every rotation of surface ahead of time so the
+        first few frames don't have to.
+        '''
+        buckets = round(360 / self.step)
+        for index in range(buckets):
+            key = (surface, index)
+            if key not in self.cache:
+                self.cache[key] = pygame.transform.rotate(surface, index * self.step)
+                
+    def stats(self):
+        '''
+        This method returns a dictionary with the cache counters.
+        '''
+        return {'surfaces': len(self.cache), 'step': self.step,
+                'hits': self.hits, 'misses': self.misses}
+
+# Shared rotation cache used by the player and projectiles.
+rotations = RotationCache()
+
+class TextCache(object):
+    '''
+    This class keeps one font per size and remembers rendered text, so labels
+    don't open the font file again or render the same text twice. The least
+    recently used text is thrown away once there are too many.
+    '''
+    def __init__(self, path='fonts/font.ttf', max_size=256):
+        '''
+        This initializer takes 2 parameters:
+        path : the font file every label uses.
+        max_size : how many rendered texts to keep.
+        '''
+        self.path = path
+        self.max_size = max_size
+        # Fonts keyed by size
+        self.fonts = {}
+        # Rendered surfaces keyed by (text, size, colour), oldest first
+        self.rendered = collections.OrderedDict()
+        # Labels can be rendered from the simulation thread and the window's
+        # thread at once (see pipeline.py)
+        self.lock = threading.Lock()
+        
+        # Counters to check how well the cache is doing
+        self.hits = 0
+        self.misses = 0
+        
+    def font(self, size):
+        '''
+        This method returns the font for the given size, loading it once.
+        '''
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(self.path, size)
+        return self.fonts[size]
+    
+    def render(self, text, size, colour=(0, 255, 255)):
+        '''
+        This method returns text rendered (antialiased) with the font of the
+        given size. The returned surface is shared, so it must not be drawn on.
+        '''
+        key = (text, size, colour)
+        with self.lock:
+            if key in self.rendered:
+                self.hits += 1
+                self.rendered.move_to_end(key)
+                return self.rendered[key]
+            
+            self.misses += 1
+            surface = self.font(size).render(text, True, colour)
+            self.rendered[key] = surface
+            # Throw away the least recently used text.
+            if len(self.rendered) > self.max_size:
+                self.rendered.popitem(last=False)
+            return surface
+    
+    def stats(self):
+        '''
+        This method returns a dictionary with the cache counters.
+        '''
+        return {'fonts': len(self.fonts), 'texts': len(self.rendered),
+                'hits': self.hits, 'misses': self.misses}
+
+# Shared fonts and rendered text used by every label.
+fonts = TextCache()
+
+class SpritePool(object):
+    '''
+    This class keeps sprites that were killed so they can be used again
+    instead of making new ones. The sprite class must be a PooledSprite
+    whose reset() takes the same parameters as its initializer.
+    '''
+    def __init__(self, spriteClass):
+        '''
+        This initializer takes the class of the sprites to pool.
+        '''
+        self.spriteClass = spriteClass
+        # Killed sprites waiting to be used again
+        self.free = []
+        
+        # Counters to check how well the pool is doing
+        self.created = 0
+        self.reused = 0
+        
+    def acquire(self, *args):
+        '''
+        This method returns a sprite set up with args, reusing a killed one
+        when there is one.
+        '''
+        if self.free:
+            sprite = self.free.pop()
+            sprite.pooled = False
+            sprite.reset(*args)
+            self.reused += 1
+        else:
+            sprite = self.spriteClass(*args)
+            sprite.pool = self
+            self.created += 1
+        return sprite
+    
+    def release(self, sprite):
+        '''
+        This method puts a killed sprite back in the pool (only once, however
+        many times it is killed).
+        '''
+        if not sprite.pooled:
+            sprite.pooled = True
+            self.free.append(sprite)
+            
+    def stats(self):
+        '''
+        This method returns a dictionary with the pool counters.
+        '''
+        return {'created': self.created, 'reused': self.reused,
+                'free': len(self.free)}
+
+class PooledSprite(pygame.sprite.Sprite):
+    '''
+    This class defines a sprite that goes back to its SpritePool (if it came
+    from one) when it is killed.
+    '''
+    # The SpritePool the sprite came from, and True while it waits in it
+    pool = None
+    pooled = False
+    
+    def kill(self):
+        '''
+        This method removes the sprite from every group and gives it back to
+        its pool.
+        '''
+        pygame.sprite.Sprite.kill(self)
+        if self.pool:
+            self.pool.release(self)
+
+class Player(pygame.sprite.Sprite):
+    '''
+    This class defines the sprite for the player
+    '''
+    def __init__(self, screen):
+        '''
+        This initializer takes a screen surface as a parameter.
+        '''
+        # Call the parent __init__() method
+        pygame.sprite.Sprite.__init__(self)
+         
+        # Loading the full turret and empty turret to have an animation.
+        self.fullTurret = assets.image('images/turret.png')
+        self.emptyTurret = assets.image('images/emptyTurret.png')
+
+        
+        # Load ready image and get rect attributes
+        self.image = self.fullTurret
+        self.original_image = self.image
+        self.rect = self.image.get_rect()
+        
+        # 60 pixels right of endzone and centered.
+        self.rect.left = 60
+        self.rect.centery = screen.get_height() // 2
+        
+        self.screen = screen
+    
+    def rotate(self, xy_pos):
+        '''
+        This method will rotate the image based off the mouse's position.
+        The arguements required are the mouse's x and y position
+        This method is the same as the projectile's rotate method.
+        '''
+        # Used to keep the image in its position.
+        original_center = self.rect.center
+        
+        # Rotate image based off degrees given
+        rotate_degrees = find_angle(original_center, xy_pos)
+        self.image = rotations.get(self.original_image, rotate_degrees)
+        
+        # Get new rect but keep position
+        self.rect = self.image.get_rect()
+        self.rect.center = original_center
+    
+    def shoot(self):
+        '''
+        This method changes the image to the empty turret after it shoots a
+        missile.
+        '''
+        self.image = self.emptyTurret
+        self.original_image = self.image
+    
+    def reload(self):
+        '''
+        This method reloads the turret after the missile is back and puts the
+        first image back to self.image.
+        '''
+        self.image = self.fullTurret
+        self.original_image = self.image
+        
+    def move(self, y_direction):
+        '''
+        This method will be called to move the player 5 pixels (when the key
+        is pressed down)
+        '''
+        self.rect.centery += y_direction
+    
+    def update(self):
+        '''
+        This method will check to make sure the player doesn't go off screen.
+        '''
+        if self.rect.top <= 60:
+            self.rect.top = 65
+        if self.rect.bottom >= self.screen.get_height() - 10:
+            self.rect.bottom = self.screen.get_height() - 15
+            
+class Plane(pygame.sprite.Sprite):
+    '''
+    This class defines a plane sprite for the enemies trying to get to the
+    left endzone.
+    '''
+    def __init__(self, screen, xy_pos, x_speed, y_speed, rng=random):
+        '''
+        This initializer method takes 2 parameters:
+        screen : the pygame surface object that will be used to make sure the 
+                 plane only moves after it passes the right side of the screen.
+        xy_pos : a tuple that defines the center of the plane.
+        x_speed : defines self.dx (speed it moves at depending on the wave).
+        y_speed : defines self.dy (up and down bouncing for harder levels).
+        rng : the random number generator used to pick the image (a game's
+              own random.Random so it can be replayed).
+        '''
+        # Call the parent __init__() method.
+        pygame.sprite.Sprite.__init__(self)
+        
+        # Load the image
+        planes = assets.planes()
+        self.image = planes[rng.randrange(2)]
+        self.rect = self.image.get_rect()
+        
+        self.rect.center = xy_pos
+        
+        self.dx = x_speed
+        self.dy = y_speed
+        
+        self.screen = screen
+        
+    def change_directionY(self):
+        '''
+        This method reverses the y direction when it hits the top or bottom
+        endzone.
+        '''
+        self.dy = -self.dy
+        self.rect.centery -= self.dy
+        
+    def update(self):
+        '''
+        This method will be automatically called to update the position
+        of the plane.
+        '''
+        self.rect.centerx -= self.dx
+        # Make sure only change y direction if passed right side of screen.
+        if self.rect.left < self.screen.get_width():
+            self.rect.centery -= self.dy
+            
+class Crosshair(pygame.sprite.Sprite):
+    '''
+    This class defines a crosshair sprite for the mouse's position.
+    '''
+    def __init__(self):
+        '''
+        This initializer method does not take any parameters.
+        '''
+        # Call the parent __init__() method.
+        pygame.sprite.Sprite.__init__(self)
+        
+        self.image = assets.image('images/crosshair.png')
+        self.rect = self.image.get_rect()
+    
+    def set_position(self, xy_pos):
+        '''
+        This method changes the position of the crosshair depending on the
+        position of the mouse.
+        '''
+        self.rect.center = xy_pos
+    
+class Projectile(PooledSprite):
+    '''
+    This class defines the projectile sprite for the game.
+    '''
+    def __init__(self, screen, xy_pos):
+        '''
+        This initializer takes the screen and xy_pos as a parameter.
+        xy_pos is the centerx and centery tuple that determines where the 
+        projectile starts.
+        '''
+        # Call the parent __init__() method
+        pygame.sprite.Sprite.__init__(self)
+        self.reset(screen, xy_pos)
+        
+    def reset(self, screen, xy_pos):
+        '''
+        This method sets the projectile up as new (it takes the same
+        parameters as the initializer), used when it comes back from a pool.
+        '''
+        # Load the projectile.
+        self.image = assets.image('images/missile.png')
+        self.rect = self.image.get_rect()
+        
+        self.dx = 20
+        
+        # Set starting position
+        self.rect.center = xy_pos
+        
+        # Save original image to rotate
+        self.original_image = self.image
+        
+        # Save the screen as an instance variable for rotation purposes
+        self.screen = screen
+        
+    def set_position(self, xy_pos):
+        '''
+        This method changes the starting position of the missile.
+        '''
+        self.rect.center = xy_pos
+        
+    def set_speed(self, xy_pos):
+        '''
+        This method will define self.dy and possibly modify self.dx to move the 
+        projectile.
+        '''
+        # Get x and y position from the tuple.
+        x_pos, y_pos = xy_pos
+        
+        # Here we will be using y=mx+b equation. b is not needed since b is 
+        # always the starting value, 0.
+        distance_x = (x_pos - self.rect.centerx)
+        distance_y = (y_pos - self.rect.centery)
+        
+        try:
+            # The slope cannot account for distance x's direction, only y.
+            slope = distance_y/abs(distance_x)
+        except ZeroDivisionError:
+            # If distance_x is 0, then dx should be 0 and only dy should be moving.
+            if distance_y < 0:
+                self.dy = -20
+                self.dx = 0
+            else:
+                self.dy = 20
+                self.dx = 0
+            return
+        
+        # If the speed is higher than 20, then make the speed a maximum of 20.
+        if slope * self.dx >= 20:
+            self.dx = 20 / slope
+        elif slope * self.dx <= -20:
+            self.dx = -20 / slope
+            
+        # y = slope * x, y=mx
+        self.dy = slope*self.dx
+        
+        # distance_x negative means dx must be negative (but cannot affect the
+        # y=mx equation so its put after).
+        if distance_x < 0:
+            self.dx = -self.dx
+        
+    def rotate(self, xy_pos):
+        '''
+        This method rotates the picture to the correct direction the projectile
+        is going in.
+        '''
+        # Get original center to keep image in same place.
+        original_center = self.rect.center
+        
+        # Rotate image based off degrees given
+        rotate_degrees = find_angle(original_center, xy_pos)
+        self.image = rotations.get(self.original_image, rotate_degrees)
+        
+        # Get new rect but keep original position
+        self.rect = self.image.get_rect()
+        self.rect.center = original_center
+        
+    def update(self):
+        '''
+        This method will be called automatically to make the projectile move 
+        forward.
+        '''
+        self.rect.centerx += self.dx
+        self.rect.centery += self.dy
+        
+class Explosion(PooledSprite):
+    '''
+    This class defines an explosion sprite that appears when the missile
+    hits a plane or an endzone.
+    '''
+    def __init__(self, xy_pos, explosionType):
+        '''
+        This initializer method takes in xy_pos as a parameter to determine
+        where the explosion appears
+        explosionType : 0 or 1 defining which type of explosion it is
+        0 being the missile on plane explosion
+        1 being plane on left endzone explosion
+        '''
+        # Call the parent __init__() method
+        pygame.sprite.Sprite.__init__(self)
+        self.reset(xy_pos, explosionType)
+        
+    def reset(self, xy_pos, explosionType):
+        '''
+        This method starts the explosion again (it takes the same parameters
+        as the initializer), used when it comes back from a pool.
+        '''
+        # Frames are shared between every explosion of the same type.
+        self.images = assets.frames(explosionType)
+        self.imageNum = 0
+        
+        self.image = self.images[self.imageNum]
+        self.rect = self.image.get_rect()
+        self.rect.center = xy_pos
+        
+    def update(self):
+        '''
+        This method will be automatically called to self destruct after explosion
+        ends.
+        '''
+        self.image = self.images[self.imageNum]
+        self.imageNum += 1
+        if self.imageNum == len(self.images):
+            self.kill()
+
+# Shared pools the game takes its missiles and explosions from.
+projectiles = SpritePool(Projectile)
+explosions = SpritePool(Explosion)
+            
+class EndZone(pygame.sprite.Sprite):
+    '''
+    This class defines an endzone sprite that will be used around the window to
+    detect if anything goes off the screen.
+    '''
+    def __init__(self, screen, x_coord, y_coord, horizontal):
+        '''
+        This initializer takes in 4 parameters
+        screen : the pygame.Surface object used to get width and height
+        x_coord : the left side x coordinate to make the endzone
+        y_coord : the top side y coordinate to make the endzonw
+        horizontal : a bool value, True means its the top or bottom, False means
+                     left or right
+        '''
+        # Call the parent __init__() method
+        pygame.sprite.Sprite.__init__(self)
+        
+        # Create the endzone Surface object
+        if horizontal:
+            # Make this 30 pixels to prevent explosions from touching the 
+            # scorekeeper label.
+            self.image = pygame.Surface((screen.get_width(), 50))
+        else:
+            self.image = pygame.Surface((screen.get_width(), screen.get_height()))
+        
+        self.image = self.image.convert()
+        
+        self.rect = self.image.get_rect()
+        
+        # Set the endzone to the given coordinates
+        self.rect.left = x_coord
+        self.rect.top = y_coord
+
+class ScoreKeeper(pygame.sprite.Sprite):
+    '''
+    This class defines a label sprite to display the score.
+    '''
+    def __init__(self, screen):
+        '''
+        This initializer loads the font "Star Jedi Rounded", and
+        sets the starting score to 0
+        '''
+        # Call the parent __init__() method
+        pygame.sprite.Sprite.__init__(self)
+ 
+        # Load our custom font, and initialize the starting score.
+        self.font = fonts.font(30)
+        self.score = 0
+        self.lives = 20
+        self.wave = 0
+        
+        # Number of spaces between each value
+        self.spaces = 7
+        
+        self.screen = screen
+        
+        # Values shown on the current image, used to only render again when
+        # one of them changes.
+        self.shown = None
+        self.update()
+        
+    def add_score(self, value):
+        '''
+        This method adds a score for the player when a plane dies.
+        The value parameter is the score they gain.
+        This method will only be called if the plane dies to a missile or by
+        hitting the player.
+        '''
+        self.score += value
+        
+    def subtract_life(self):
+        '''
+        This method subtracts a life from the player.
+        '''
+        self.lives -= 1
+        
+    def add_wave(self):
+        '''
+        This method adds a wave when called.
+        '''
+        self.wave += 1
+        
+    def check_lose(self):
+        '''
+        This method returns a bool value whether the player has lost all their
+        lives or not.
+        '''
+        return self.lives == 0
+ 
+    def update(self):
+        '''
+        This method will be called automatically to display the current score,
+        wave, and lives at the top of the game window. It only makes a new
+        image when one of the values changed.
+        '''
+        values = (self.lives, self.wave, self.score)
+        if values == self.shown:
+            return
+        self.shown = values
+        
+        # Each field is a label and a number rendered separately, so a score
+        # change only renders the new digits.
+        fields = []
+        for name, value in zip(('Lives:', 'Wave:', 'Score:'), values):
+            fields.append((fonts.render(name, 30, (255, 255, 255)),
+                           fonts.render(str(value), 30, (255, 255, 255))))
+        width = sum(label.get_width() + number.get_width() for label, number in fields)
+        
+        # Take away spaces until the whole message fits on the screen.
+        gap = self.font.size(' '*self.spaces)[0]
+        while self.spaces and width + 2*gap > self.screen.get_width():
+            self.spaces -= 1
+            gap = self.font.size(' '*self.spaces)[0]
+        
+        # Put the fields side by side on one image.
+        self.image = pygame.Surface((width + 2*gap, self.font.get_height()), pygame.SRCALPHA)
+        x = 0
+        for label, number in fields:
+            for surface in (label, number):
+                # Fields never overlap, so max keeps the text exactly as rendered
+                self.image.blit(surface, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+                x += surface.get_width()
+            x += gap
+        self.rect = self.image.get_rect()
+        self.rect.center = (self.screen.get_width()/2, 15)
+            
+class WaveLabel(pygame.sprite.Sprite):
+    '''
+    This class defines the large 'wave' label that appears every wave.
+    '''
+    def __init__(self, wave):
+        '''
+        This initializer takes the wave number as a parameter.
+        '''
+        # Call the parent __init__() function
+        pygame.sprite.Sprite.__init__(self)
+        
+        self.font = fonts.font(100)
+        
+        self.image = fonts.render(f'Wave {wave}', 100)
+        self.rect = self.image.get_rect()
+        self.rect.left = 110
+        self.rect.top = 150
+        
+        # Used to add a wave number.
+        self.wave = wave
+        
+    def add_wave(self):
+        '''
+        This method adds one to the wave number.
+        '''
+        self.wave += 1
+        self.image = fonts.render(f'Wave {self.wave}', 100)
+        
+class Label(pygame.sprite.Sprite):
+    '''
+    This class defines a label sprite used to display text on start and end menu.
+    '''
+    def __init__(self, text, size, center=(0, 0), left=0, top=0):
+        '''
+        This initializer method takes 4 parameters
+        center : (x, y) tuple that defines the center of the label
+        text : the string to be displayed
+        size : an integer representing the text size
+        '''
+        # Call the parent __init__() method
+        pygame.sprite.Sprite.__init__(self)
+        
+        self.font = fonts.font(size)
+        self.size = size
+        self.text = text
+        self.image = fonts.render(text, size)
+        self.rect = self.image.get_rect()
+        if left and top:
+            self.rect.left = left
+            self.rect.top = top
+        elif center:
+            self.rect.center = center
+        
+    def change_text(self, text):
+        '''
+        This method changes the label's text.
+        '''
+        self.image = fonts.render(text, self.size)
+        self.text = text
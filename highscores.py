@@ -0,0 +1,177 @@
+'''
+
+Description: This module keeps the high scores.
+
+Every finished game is added as one line to highscores.log (an append-only
+log, one JSON object per line):
+    {"score": 3535, "wave": 25, "date": "2019-05-03T14:02:11", "hacks": true}
+wave, date and hacks are null for scores imported from an old highscores.txt.
+A line that was only half written (the game was closed while saving) is
+skipped when loading, and the next run is written on a new line after it.
+
+highscores.txt is still written with the best scores, in the same
+"1. 3535" format as before, but through a temporary file and a rename so it
+is never left half written.
+
+The log is read once when the store is made. After that the best scores are
+kept in a heap in memory, so the menu never has to read the disk.
+
+'''
+
+import os
+import json
+import heapq
+import datetime
+import collections
+
+# One finished game
+Run = collections.namedtuple('Run', 'score wave date hacks')
+
+class HighscoreStore(object):
+    '''
+    This class holds every recorded run and the best scores.
+    '''
+    def __init__(self, path='highscores.log', textPath='highscores.txt', size=9):
+        '''
+        This initializer takes 3 parameters:
+        path : the append-only log of every run.
+        textPath : the file listing the best scores.
+        size : how many best scores are kept (and shown in the menu).
+        '''
+        self.path = path
+        self.textPath = textPath
+        self.size = size
+
+        # Every run in the order it was played
+        self.runs = []
+        # Min-heap of (score, order) of the best runs, so the lowest of
+        # the best scores is always first.
+        self.best = []
+
+        if os.path.exists(path):
+            self.load()
+        else:
+            self.import_text()
+
+    def load(self):
+        '''
+        This method reads every run from the log.
+        '''
+        with open(self.path, 'r') as file:
+            for line in file:
+                try:
+                    run = Run(**json.loads(line))
+                except (ValueError, TypeError):
+                    # Half written line
+                    continue
+                self.remember(run)
+
+    def import_text(self):
+        '''
+        This method makes a new log from the scores in an old highscores.txt
+        (if there is one).
+        '''
+        scores = []
+        try:
+            with open(self.textPath, 'r') as file:
+                for line in file:
+                    # Each line is "placement. score"
+                    try:
+                        scores.append(int(line.split('.', 1)[1]))
+                    except (IndexError, ValueError):
+                        continue
+        except FileNotFoundError:
+            pass
+        for score in scores:
+            if score:
+                self.add(Run(score, None, None, None), False)
+        self.write_text()
+
+    def remember(self, run):
+        '''
+        This method adds a run to the memory only (not to the files).
+        Keeping the best scores takes O(log size) per run.
+        '''
+        entry = (run.score, len(self.runs))
+        self.runs.append(run)
+        if len(self.best) < self.size:
+            heapq.heappush(self.best, entry)
+        elif entry[0] > self.best[0][0]:
+            heapq.heapreplace(self.best, entry)
+
+    def add(self, run, writeText=True):
+        '''
+        This method records a run: it is appended to the log (and flushed to
+        the disk) and highscores.txt is written again.
+        '''
+        line = (json.dumps(run._asdict()) + '\n').encode()
+        with open(self.path, 'a+b') as file:
+            # A line left half written (the game was closed while saving) has
+            # no newline, end it first so this run is not joined onto it.
+            end = file.seek(0, os.SEEK_END)
+            if end:
+                file.seek(end - 1)
+                if file.read(1) != b'\n':
+                    line = b'\n' + line
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+        self.remember(run)
+        if writeText:
+            self.write_text()
+
+    def record(self, scoreKeeper, hacks):
+        '''
+        This method records the game that just ended.
+        scoreKeeper : the game's ScoreKeeper.
+        hacks : a bool value, True if the computer played.
+        '''
+        date = datetime.datetime.now().isoformat(timespec='seconds')
+        self.add(Run(scoreKeeper.score, scoreKeeper.wave, date, hacks))
+
+    def top(self):
+        '''
+        This method returns the best runs, highest score first (runs with the
+        same score are in the order they were played).
+        '''
+        entries = sorted(self.best, key=lambda entry: (-entry[0], entry[1]))
+        return [self.runs[order] for score, order in entries]
+
+    def lines(self):
+        '''
+        This method returns the text of each high score line, with 0 for
+        empty places ("1. 3535", "2. 0" ...).
+        '''
+        scores = [run.score for run in self.top()]
+        scores += [0] * (self.size - len(scores))
+        return [f'{placement}. {score}' for placement, score in enumerate(scores, 1)]
+
+    def write_text(self):
+        '''
+        This method writes highscores.txt through a temporary file which is
+        then renamed over the old one.
+        '''
+        temporary = self.textPath + '.tmp'
+        with open(temporary, 'w') as file:
+            file.write(''.join(line + '\n' for line in self.lines()))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.textPath)
+
+    def query(self, hacks=None, min_wave=0, since=None):
+        '''
+        This method returns the runs matching all the given filters.
+        hacks : True or False to only get runs with hacks on or off.
+        min_wave : only runs that reached at least this wave.
+        since : an ISO date string, only runs played on or after it.
+        '''
+        found = []
+        for run in self.runs:
+            if hacks is not None and run.hacks != hacks:
+                continue
+            if min_wave and (run.wave or 0) < min_wave:
+                continue
+            if since and (run.date is None or run.date < since):
+                continue
+            found.append(run)
+        return found
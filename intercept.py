@@ -0,0 +1,130 @@
+'''
+
+Description: This module aims the missile for the hacks bot. Instead of
+shooting at where a plane is now, it works out where every plane will be in
+the next frames (bounces off the top and bottom included), where the missile
+can meet each of them, and picks the shot that destroys the most planes.
+
+'''
+
+import numpy
+import gameSprites
+
+# Pixels the missile moves each frame along its main direction (see
+# Projectile.set_speed)
+MISSILE_SPEED = 20
+
+def overlaps(rect, left, top, width, height):
+    '''
+    This function returns which of the rects given as arrays overlap rect,
+    using the same test as Rect.colliderect.
+    '''
+    return (left < rect.right) & (top < rect.bottom) & \
+           (left + width > rect.left) & (top + height > rect.top)
+
+class InterceptSolver(object):
+    '''
+    This class picks where the bot shoots. Every alive plane is moved ahead
+    at once with NumPy, then the best few intercepts are checked frame by
+    frame with the real missile path.
+    '''
+    def __init__(self, screen, candidates=16):
+        '''
+        This initializer takes 2 parameters:
+        screen : the pygame surface the game is played on.
+        candidates : how many of the most urgent planes (closest to the
+                     tower) are checked as targets.
+        '''
+        self.screen = screen
+        self.candidates = candidates
+        # The missile is destroyed by the endzones, so it never flies longer
+        # than it takes to cross the screen.
+        self.horizon = max(screen.get_size()) // MISSILE_SPEED + 1
+        # Missile flown to test each shot (set up again for every shot)
+        self.probe = gameSprites.Projectile(screen, (0, 0))
+
+    def missile_path(self, origin, target, endzones):
+        '''
+        This method flies a missile fired from origin at target until it
+        touches an endzone, and returns its rects (left, top, right, bottom)
+        for each frame as an array.
+        '''
+        missile = self.probe
+        missile.reset(self.screen, origin)
+        missile.set_speed(target)
+        missile.rotate(target)
+        rect = missile.rect
+        path = [(rect.left, rect.top, rect.right, rect.bottom)]
+        # The planes are checked before the endzones each frame
+        while len(path) <= self.horizon and rect.collidelist(endzones) == -1:
+            missile.update()
+            path.append((rect.left, rect.top, rect.right, rect.bottom))
+        return numpy.array(path)
+
+    def solve(self, world):
+        '''
+        This method returns (target, kills) for a missile fired now from the
+        player of world: the (x, y) point to fire at and how many planes it
+        is expected to destroy. The target is the first plane's center (and
+        kills is 0) when no shot can hit anything.
+        '''
+        planes = world.planes
+        origin = world.player.rect.center
+        screenWidth = self.screen.get_width()
+        top = world.topEndzone.rect.bottom
+        bottom = world.bottomEndzone.rect.top
+        endzones = [zone.rect for zone in (world.leftEndzone, world.rightEndzone,
+                                           world.topEndzone, world.bottomEndzone)]
+        fallback = (planes.center(planes.first()[0]), 0)
+
+        # Where every plane will be in each of the next frames
+        indices, lefts, tops = planes.predict(self.horizon, (world.topEndzone.rect,
+                                                             world.bottomEndzone.rect))
+        # Only planes that reach the screen in time can be hit
+        onScreen = lefts[-1] < screenWidth
+        indices, lefts, tops = indices[onScreen], lefts[:, onScreen], tops[:, onScreen]
+        if not len(indices):
+            return fallback
+        widths = planes.width[indices]
+        heights = planes.height[indices]
+
+        # Planes that touched the left endzone are gone the frame after
+        touched = overlaps(world.leftEndzone.rect, lefts, tops, widths, heights)
+        alive = numpy.ones_like(touched)
+        alive[1:] = ~numpy.logical_or.accumulate(touched, axis=0)[:-1]
+
+        # The missile can meet a plane at frame n if its center is inside the
+        # playing field and no further than n missile steps away.
+        x = lefts + widths // 2
+        y = tops + heights // 2
+        steps = numpy.arange(self.horizon + 1)[:, None]
+        reach = numpy.maximum(abs(x - origin[0]), abs(y - origin[1])) <= steps * MISSILE_SPEED
+        reach &= alive & (x > 0) & (x < screenWidth) & (y > top) & (y < bottom)
+        reachable = reach.any(axis=0).nonzero()[0]
+        if not len(reachable):
+            return fallback
+        meet = reach[:, reachable].argmax(axis=0)
+
+        # Try the planes closest to the tower first
+        order = numpy.argsort(lefts[0, reachable], kind='stable')[:self.candidates]
+        best = fallback
+        for candidate in order:
+            plane = reachable[candidate]
+            frame = meet[candidate]
+            target = (int(x[frame, plane]), int(y[frame, plane]))
+            path = self.missile_path(origin, target, endzones)
+            frames = len(path)
+
+            # Every plane the missile overlaps in each frame of its flight
+            hit = (path[:, 0, None] < lefts[:frames] + widths) & \
+                  (path[:, 2, None] > lefts[:frames]) & \
+                  (path[:, 1, None] < tops[:frames] + heights) & \
+                  (path[:, 3, None] > tops[:frames]) & alive[:frames]
+            counts = hit.sum(axis=1)
+            if not counts.any():
+                continue
+            # The missile is gone after the first frame it hits something
+            kills = int(counts[counts.nonzero()[0][0]])
+            if kills > best[1]:
+                best = (target, kills)
+        return best
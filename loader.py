@@ -0,0 +1,209 @@
+'''
+
+Description: This module loads images, sounds and music on a background
+thread so the window keeps drawing while files are read and decoded.
+
+Images are decoded on the thread but can only be converted to the window's
+pixel format on the main thread, so the main thread calls pump() every frame
+to convert whatever is ready (it is then in gameSprites.assets like any
+other image). The sprite atlas sheet (see atlas.py) is checked, made again
+if needed, and read on the thread the same way.
+
+'''
+
+import io
+import time
+import queue
+import threading
+import pygame
+import gameSprites
+import atlas
+
+class AssetLoader(object):
+    '''
+    This class reads and decodes files on a worker thread. Ask for files with
+    the request methods, call pump() from the main thread, and get sounds and
+    music with sound() and music() (they wait if the file is not ready yet).
+    '''
+    def __init__(self):
+        '''
+        This initializer starts the worker thread. It does not take any
+        parameters.
+        '''
+        # (kind, path, alpha) waiting to be read by the worker
+        self.jobs = queue.Queue()
+        # (kind, path, alpha, value or exception, seconds) waiting for pump()
+        self.decoded = queue.Queue()
+        self.sounds = {}
+        self.musicFiles = {}
+        # Exceptions raised while loading, raised again when the file is used
+        self.errors = {}
+        # Seconds the worker spent on each file
+        self.timings = {}
+        self.requested = set()
+        # Sprite images that come from the atlas sheet once it is loaded
+        self.atlasPaths = []
+        self.total = 0
+        self.done = 0
+
+        # Reported times are measured from when the loader was made
+        self.start = time.perf_counter()
+        self.reported = set()
+
+        self.thread = threading.Thread(target=self.work, name='AssetLoader', daemon=True)
+        self.thread.start()
+
+    def request(self, kind, path, alpha=True):
+        '''
+        This method queues one file for the worker (files asked for twice are
+        only loaded once).
+        kind : 'image', 'sound', 'music' or 'atlas'.
+        '''
+        if (kind, path) in self.requested:
+            return
+        self.requested.add((kind, path))
+        self.total += 1
+        self.jobs.put((kind, path, alpha))
+
+    def request_atlas(self):
+        '''
+        This method queues the atlas sheet with every sprite image. The
+        images are only queued one by one if the sheet cannot be made.
+        '''
+        self.atlasPaths = gameSprites.assets.paths()
+        self.request('atlas', atlas.SHEET)
+
+    def request_images(self, paths, alpha=True):
+        '''
+        This method queues images that are not in gameSprites.assets yet (or
+        coming from the atlas sheet).
+        '''
+        for path in paths:
+            if alpha and path in self.atlasPaths:
+                continue
+            if (path, alpha) not in gameSprites.assets.images:
+                self.request('image', path, alpha)
+
+    def request_sounds(self, paths):
+        '''
+        This method queues sound effects.
+        '''
+        for path in paths:
+            self.request('sound', path)
+
+    def request_music(self, path):
+        '''
+        This method queues a music file (only its bytes are read, the mixer
+        decodes music while it plays).
+        '''
+        self.request('music', path)
+
+    def work(self):
+        '''
+        This method runs on the worker thread and loads queued files forever.
+        '''
+        while True:
+            kind, path, alpha = self.jobs.get()
+            start = time.perf_counter()
+            try:
+                if kind == 'image':
+                    value = pygame.image.load(path)
+                elif kind == 'sound':
+                    value = pygame.mixer.Sound(path)
+                elif kind == 'atlas':
+                    value = atlas.read(gameSprites.assets.paths())
+                else:
+                    with open(path, 'rb') as file:
+                        value = file.read()
+            except Exception as error:
+                value = error
+            self.decoded.put((kind, path, alpha, value, time.perf_counter() - start))
+
+    def pump(self, budget=0.004, block=False):
+        '''
+        This method (main thread only) takes in the files the worker finished,
+        converting images, for at most budget seconds.
+        block : True to wait for at least one file.
+        '''
+        end = time.perf_counter() + budget
+        while True:
+            try:
+                kind, path, alpha, value, seconds = self.decoded.get(block)
+            except queue.Empty:
+                return
+            block = False
+            self.done += 1
+            self.timings[path] = seconds
+            if isinstance(value, Exception):
+                self.errors[path] = value
+            elif kind == 'image':
+                gameSprites.assets.add(path, value, alpha)
+            elif kind == 'sound':
+                self.sounds[path] = value
+            elif kind == 'atlas':
+                if value:
+                    gameSprites.assets.add_atlas(atlas.views(*value))
+                # Load the images the sheet did not give one by one
+                paths = self.atlasPaths
+                self.atlasPaths = []
+                self.request_images(paths)
+            else:
+                self.musicFiles[path] = value
+            if time.perf_counter() >= end:
+                return
+
+    def finished(self):
+        '''
+        This method returns True when every requested file was taken in.
+        '''
+        return self.done == self.total
+
+    def progress(self):
+        '''
+        This method returns how much of the requested files were taken in,
+        from 0 to 1.
+        '''
+        if not self.total:
+            return 1.0
+        return self.done / self.total
+
+    def wait(self, kind, path):
+        '''
+        This method waits until the file at path was taken in (asking for it
+        first if nobody did), and raises its error if it could not be loaded.
+        '''
+        self.request(kind, path)
+        loaded = self.sounds if kind == 'sound' else self.musicFiles
+        while path not in loaded and path not in self.errors:
+            self.pump(block=True)
+        if path in self.errors:
+            raise self.errors[path]
+
+    def sound(self, path):
+        '''
+        This method returns the pygame.mixer.Sound for path.
+        '''
+        self.wait('sound', path)
+        return self.sounds[path]
+
+    def music(self, path):
+        '''
+        This method loads the music at path into pygame.mixer.music from
+        memory (it does not start playing).
+        '''
+        self.wait('music', path)
+        # The extension tells the mixer what kind of file it is
+        pygame.mixer.music.load(io.BytesIO(self.musicFiles[path]), path.rsplit('.', 1)[-1])
+
+    def report(self, label, since=None):
+        '''
+        This method prints how long it took to get to label, the first time
+        label is reported. The time is measured from since (a
+        time.perf_counter() value), or from when the loader was made.
+        '''
+        if label in self.reported:
+            return
+        self.reported.add(label)
+        if since is None:
+            since = self.start
+        print(f'{label}: {(time.perf_counter() - since) * 1000:.0f} ms')
@@ -1,670 +1,723 @@
-'''
-
-By: Mark Xue
-
-Date: May 3, 2019
-
-Description: This program is a tower defense game.
-
-
-AIRPLANE DEFENSE V2.0.0
-------------------------------------------------------------------------------
-This is a tower defense inspired game:
-The goal of the game is to survive as many waves of airplanes as possible, 
-with each wave having increasing speed, and reach the highest score possible.
-
-How to play this game:
-
-Controls:
-W, S, Q, and mouse control
-
-Pressing down W moves your player up and S moves it down.
-Use your mouse to move the cursor and left click to shoot down the airplanes 
-trying to reach the left side (your tower).
-Press Q anytime during the game to pause the game. 
-Left click anywhere or press Q again to unpause.
-
-If the planes hit your tank they will also die
-
-If the planes reach your tower, they will blow up and you will lose a life.
-
-You have a total of 20 lives.
-
-Scoring:
-10 points will be awarded for every hit with the missile
-5 points if you kill them with your tank
-No points will be rewarded if they blow up when hitting the tower.
-
-'''
-             
-# I - Import and Initialize
-import pygame
-import gameSprites
-import random
-import os
-pygame.init()
-
-#Center screen
-os.environ['SDL_VIDEO_CENTERED'] = '1'
-
-def instructionsScreen(crosshair, screen):
-    '''
-    This function is used to display the instructions picture to teach the user
-    how to play the game.
-    '''
-    controls = pygame.image.load('images/instructions.png')
-    group = pygame.sprite.Group(crosshair)
-    keepGoing = True
-    pygame.mouse.set_visible(False)
-    
-    while keepGoing:
-        xy_position = pygame.mouse.get_pos()
-        crosshair.set_position(xy_position)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                keepGoing = False
-            # Exit when user left clicks
-            if event.type == pygame.MOUSEBUTTONDOWN and pygame.mouse.get_pressed()[0]:
-                keepGoing = False
-            
-        screen.blit(controls, (0, 0))
-        group.draw(screen)
-        pygame.display.flip()
-        
-def pauseScreen(crosshair, screen, background):
-    '''
-    This function is used to pause the game
-    '''
-    click = gameSprites.Label("left click anywhere to continue", 30, center=(screen.get_width()/2, 20))
-    # Change into picture and fade in+out
-    pause = pygame.image.load('images/pause.png').convert()
-    group = pygame.sprite.OrderedUpdates(click, crosshair)
-    keepGoing = True
-    screen.blit(background, (0, 0))
-    alpha = 255
-    add = -5
-    
-    # Assign key variables
-    clock = pygame.time.Clock()    
-    
-    while keepGoing:
-        # 30 frames loaded per second
-        clock.tick(30)
-        xy_position = pygame.mouse.get_pos()
-        crosshair.set_position(xy_position)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                click.kill()
-                keepGoing = False
-            # Exit when user left clicks
-            if event.type == pygame.MOUSEBUTTONDOWN and pygame.mouse.get_pressed()[0]:
-                click.kill()
-                keepGoing = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    click.kill()
-                    keepGoing = False
-                    
-        pause.set_alpha(alpha)
-        alpha += add
-        if alpha <= 0:
-            add = 5
-        elif alpha >= 255:
-            add = -5
-        screen.blit(background, (0, 0))
-        screen.blit(pause, (8, screen.get_height()//2-39))
-        group.draw(screen)
-        pygame.display.flip()
-
-def startMenu():
-    '''
-    This function is the start menu of the game.
-    '''
-    # Display
-    screen = pygame.display.set_mode((640, 480))
-    pygame.display.set_caption('Airplane Defense')
-    
-    # Entities
-    background = pygame.image.load('images/background.png').convert()
-    # Save rect attributes to check for mouse on buttons collision
-    startButton = pygame.draw.rect(background, (0, 255, 255), (349, 165, 105, 25), 1)
-    hacksToggle = pygame.draw.rect(background, (0, 255, 255), (349, 265, 200, 25), 1)
-    controlsButton = pygame.draw.rect(background, (0, 255, 255), (349, 215, 180, 25), 1)
-    screen.blit(background, (0, 0))
-    
-    pygame.mixer.music.load('sounds/musicEarth.mp3')
-    pygame.mixer.music.set_volume(0.3)
-    pygame.mixer.music.play(-1)    
-    
-    '''
-    For all the correct comments, these are just copy and pasted code from
-    the game function.
-    '''
-    # Load same things for training grounds before game starts
-    leftEndzone = gameSprites.EndZone(screen, -screen.get_width(), 0, False)
-    rightEndzone = gameSprites.EndZone(screen, screen.get_width(), 0, False)
-    topEndzone = gameSprites.EndZone(screen, 0, 0, True)
-    bottomEndzone = gameSprites.EndZone(screen, 0, screen.get_height(), True)
-    scoreKeeper = gameSprites.ScoreKeeper(screen)
-    player = gameSprites.Player(screen)
-    missile = gameSprites.Projectile(screen, (-30, 10))
-    crosshair = gameSprites.Crosshair()
-    # Preload explosion effects so it doesn't lag when actual explosion comes
-    explosionTemp = gameSprites.Explosion((0, 0), 0)
-    del explosionTemp
-    explosionTemp = gameSprites.Explosion((0, 0), 1)
-    del explosionTemp
-    missileSprites = pygame.sprite.Group()
-    endzoneSprites = pygame.sprite.Group(leftEndzone, rightEndzone, topEndzone,\
-                                         bottomEndzone)
-        
-    # Start button and border definitions
-    start = gameSprites.Label('start', 30, left=350, top=150)
-    startBorderx = range(startButton.left, startButton.right + 1)
-    startBordery = range(startButton.top, startButton.bottom + 1)
-    # Control instruction button and border definitions
-    controls = gameSprites.Label('controls', 30, left=350, top=200)
-    controlsBorderx = range(controlsButton.left, controlsButton.right + 1)
-    controlsBordery = range(controlsButton.top, controlsButton.bottom + 1)
-    # Hack toggle and border definitions
-    hack = gameSprites.Label('Hacks: off', 30, left=350, top=250)
-    hackBorderx = range(hacksToggle.left, hacksToggle.right + 1)
-    hackBordery = range(hacksToggle.top, hacksToggle.bottom + 1)
-    title = gameSprites.Label('List of highscores:', 30, left=120, top=70)
-    
-    # Check highscore file for list of highscores
-    y_pos = 100
-    highscores = []    
-    try:
-        file = open('highscores.txt', 'r')
-        # pygame.font.render does not aceept \n so it must be done manually.
-        for line in file:
-            highscores.append(gameSprites.Label(line.strip(), 30, left=120, top=y_pos))
-            y_pos += 30
-            if y_pos == 370:
-                break
-        file.close()
-    except FileNotFoundError:
-        highscores = gameSprites.Label('You deleted highscores.txt :(', 20, left=120, top=100)
-        
-        
-    allSprites = pygame.sprite.OrderedUpdates(highscores, start, title, hack,\
-                                              controls, player, crosshair,\
-                                              scoreKeeper)        
-    
-    # ACTION
-    
-    # Assign key variables
-    clock = pygame.time.Clock()
-    
-    # Hacks is computer playing the game.
-    hacks = False
-    moved = False
-    keepGoing = True
-    reload = 15
-    pygame.mouse.set_visible(False)
-    xy_position = pygame.mouse.get_pos()
-    
-    # Loop
-    while keepGoing:
-        
-        # Time
-        clock.tick(30)
-        
-        # Event Handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False, hacks
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if pygame.mouse.get_pressed() == (1, 0, 0):
-                    # Check if player clicks start
-                    if xy_position[0] in startBorderx and xy_position[1] in startBordery:
-                        return True, hacks
-                    # Check if player clicks instructions button
-                    if xy_position[0] in controlsBorderx and xy_position[1] in controlsBordery:
-                        instructionsScreen(crosshair, screen)
-                        screen.blit(background, (0, 0))
-                        break
-                    # Check if player toggles hacks
-                    if xy_position[0] in hackBorderx and xy_position[1] in hackBordery:
-                        if hacks:
-                            hack.change_text('Hacks: off')
-                            pygame.mixer.music.set_volume(0.3)
-                            hacks = False
-                        else:
-                            hack.change_text('Hacks: on')
-                            pygame.mixer.music.set_volume(0)
-                            hacks = True
-        
-        # Player movement        
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_w]:
-            player.move(-10)
-        if keys[pygame.K_s]:
-            player.move(10)        
-            
-        xy_position = pygame.mouse.get_pos()
-        crosshair.set_position(xy_position)
-        
-        # Shoot a missile
-        if pygame.mouse.get_pressed()[0] and not moved:
-            player.shoot()
-            missile = gameSprites.Projectile(screen, player.rect.center)
-            missile.set_speed(xy_position)
-            missile.rotate(xy_position)
-            allSprites.add(missile)
-            missileSprites.add(missile)
-            moved = True
-        
-        # Check for collision of missile with endzone    
-        collision = pygame.sprite.groupcollide(missileSprites, endzoneSprites, True, False)
-        if collision:
-            missile = list(collision)[0]
-            explosion = gameSprites.Explosion(missile.rect.center, 0)
-            allSprites.add(explosion)
-            missile.kill()
-            
-        # Set up reload speed
-        if moved:
-            reload -= 1
-            if reload == 0:
-                moved = False
-                player.reload()
-                reload = 15
-        player.rotate(xy_position)
-        
-        # Refresh display       
-        allSprites.clear(screen, background)
-        allSprites.update()
-        allSprites.draw(screen)         
-        pygame.display.flip()
-
-def gameOver(scoreKeeper):
-    '''
-    This function is the endgame screen.
-    '''
-    # Display
-    screen = pygame.display.set_mode((640, 480))    
-    pygame.display.set_caption("Airplane Defense")
-    
-    # Entities
-    background = pygame.image.load('images/background.png').convert()
-    # Save rect attributes to check for collision with mouse on button
-    button = pygame.draw.rect(background, (0, 255, 255), (220, 395, 160, 25), 1)
-    screen.blit(background, (0, 0))
-    
-    crosshair = gameSprites.Crosshair()
-    
-    highscores = []
-    try:
-        file = open('highscores.txt', 'r')
-        for line in file:
-            # Slice the position so it only contains the score and append it to
-            # highscores list
-            highscores.append(int(line[3:]))
-        highscores.append(scoreKeeper.score)
-        # Create a new list that orders the new highscores.
-        newHighscores = []
-        for i in range(len(highscores)):
-            high = max(highscores)
-            newHighscores.append(high)
-            highscores.remove(high)
-        file.close()
-        # Overwrite to make new highscores.
-        file = open('highscores.txt', 'w')
-        placement = 1
-        for highscore in newHighscores:
-            file.write(f'{placement}. {highscore}\n')
-            placement += 1
-            if placement == 10:
-                break
-    except FileNotFoundError:
-        # Create new highscores.txt file if it doesn't exsist.
-        file = open('highscores.txt', 'w')
-        file.write(f'1. {scoreKeeper.score}\n')
-        for i in range(2, 10):
-            file.write(f'{i}. 0\n')
-    file.close()
-    
-    labelBorderx = range(button.left, button.right + 1)
-    labelBordery = range(button.top, button.bottom + 1)
-    
-    label1 = gameSprites.Label('game over!', 90, center=(screen.get_width()/2, 160))
-    label2 = gameSprites.Label('your score has been recorded', 30, left=25, top=220)
-    label3 = gameSprites.Label('continue', 30, left=220, top=380)
-    label4 = gameSprites.Label(f'Score: {scoreKeeper.score} Wave: {scoreKeeper.wave}', 30, center=(screen.get_width()/2, 305))
-    allSprites = pygame.sprite.OrderedUpdates(label1, label2, label3, label4, crosshair)
-    
-    # ACTION
-    # Assign key variables
-    clock = pygame.time.Clock()
-    
-    # Loop
-    while True:
-        # Timer to set frame rate
-        clock.tick(30)
-        
-        # Events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return
-                
-        # If the mouse click is on the label
-        xy_position = pygame.mouse.get_pos()
-        if pygame.mouse.get_pressed()[0] == 1:
-            if xy_position[0] in labelBorderx and xy_position[1] in labelBordery:
-                return
-            
-        crosshair.set_position(xy_position)
-        
-        # Refresh display
-        allSprites.clear(screen, background)
-        allSprites.update()
-        allSprites.draw(screen)
-        pygame.display.flip()
-
-def game(hacks):
-    '''
-    This function is the game loop.
-    '''
-    # Display
-    screen = pygame.display.set_mode((640, 480))    
-    pygame.display.set_caption("Airplane Defense")
-     
-    # Entities
-    background = pygame.image.load('images/background.png').convert()
-    screen.blit(background, (0, 0))
-    
-    pygame.mixer.music.load('sounds/musicLife.mp3')
-    pygame.mixer.music.set_volume(0.1)
-    pygame.mixer.music.play(-1)    
-    
-    missileExplosionSound = pygame.mixer.Sound('sounds/explosion.wav')
-    missileExplosionSound.set_volume(0.3)
-    
-    planeExplosionSound = pygame.mixer.Sound('sounds/ono.wav')
-    
-    # Set up endzones that are outside of the screen.
-    leftEndzone = gameSprites.EndZone(screen, -screen.get_width(), 0, False)
-    rightEndzone = gameSprites.EndZone(screen, screen.get_width(), 0, False)
-    topEndzone = gameSprites.EndZone(screen, 0, 0, True)
-    bottomEndzone = gameSprites.EndZone(screen, 0, screen.get_height(), True)
-    
-    player = gameSprites.Player(screen)
-    
-    missile = gameSprites.Projectile(screen, (-30, 10))
-    
-    crosshair = gameSprites.Crosshair()
-    
-    scoreKeeper = gameSprites.ScoreKeeper(screen)
-    
-    waveLabel = gameSprites.WaveLabel(scoreKeeper.wave+1)  
-    
-    # Missile sprite group to check for all missiles on the screen.
-    missileSprites = pygame.sprite.Group()
-    
-    # Endzone group to check for collision
-    endzoneSprites = pygame.sprite.Group(leftEndzone, rightEndzone, topEndzone,\
-                                         bottomEndzone)
-    
-    # Plane group to check for collision
-    planeSprites = pygame.sprite.Group()
-    
-    # Add them to allSprites group to display.
-    allSprites = pygame.sprite.LayeredUpdates(player, crosshair, scoreKeeper)
-    
-    # ACTION
-
-    # Assign
-    # This variable is used to make sure it only takes the position of the first
-    # mouse click.
-    moved = False
-    
-    clock = pygame.time.Clock()
-    keepGoing = True
-    
-    # speed_up modifies the speed of the plane as the wave increases
-    speed_up = 0
-    # Time gives a 2 second pause before starting the next wave.
-    timer = 60
-    # Add planes (in increments of 100) by increasing the x coord range 
-    increase_plane = 0
-    
-    # This sets up the reload speed for the rocket (15 frames = 0.5 seconds)
-    reload = 15
-    
-    # Hide the mouse cursor to display crosshair.
-    pygame.mouse.set_visible(False)
- 
-    # Loop
-    while keepGoing:
-     
-        # Time
-        clock.tick(30)
-     
-        # Events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                keepGoing = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    pauseScreen(crosshair, screen, background)
-                    screen.blit(background, (0, 0))
-
-        # Get coordinates of mouse to later use to rotate player and missile
-        xy_position = pygame.mouse.get_pos()
-        
-        if hacks:
-            # Auto move
-            if planeSprites:
-                if abs(planeSprites.sprites()[0].rect.centery - player.rect.centery) < 10:
-                    pass
-                elif planeSprites.sprites()[0].rect.centery - player.rect.centery > 0:
-                    player.move(10)
-                elif planeSprites.sprites()[0].rect.centery - player.rect.centery < 0:
-                    player.move(-10)
-        else:
-            # Move player using keys W and S
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_w]:
-                player.move(-10)
-            if keys[pygame.K_s]:
-                player.move(10)
-        
-        # Set position of crosshair
-        crosshair.set_position(xy_position)
-        
-        if hacks:
-            # Shoot missile whenever possible with hacks on
-            if not moved:
-                # Auto aim enabled
-                # Set up missile sprite.
-                if planeSprites:
-                    missile = gameSprites.Projectile(screen, player.rect.center)
-                    # Make cpu smarter by moving towards the closest plane but 
-                    # shooting at the further plane
-                    if len(planeSprites) >= 2 and abs(planeSprites.sprites()[0].rect.centery - player.rect.centery) > 25:
-                        missile.set_speed(planeSprites.sprites()[1].rect.center)
-                        missile.rotate(planeSprites.sprites()[1].rect.center)
-                    else:
-                        missile.set_speed(planeSprites.sprites()[0].rect.center)
-                        missile.rotate(planeSprites.sprites()[0].rect.center)
-                    # Change player image to already shot.
-                    player.shoot()            
-                    # Add the missile sprite to display + update
-                    allSprites.add(missile)
-                    missileSprites.add(missile)
-                    
-                    moved = True            
-        else:
-            # Check if mouse click to shoot missile.
-            if pygame.mouse.get_pressed()[0] and not moved:
-                # Change player image to already shot.
-                player.shoot()
-                
-                # Set up missile sprite.
-                missile = gameSprites.Projectile(screen, player.rect.center)
-                missile.set_speed(xy_position)
-                missile.rotate(xy_position)
-                
-                # Add the missile sprite to display + update
-                allSprites.add(missile)
-                missileSprites.add(missile)
-                
-                moved = True
-            
-        # Check for collision of missile with planes.
-        collision = pygame.sprite.groupcollide(missileSprites, planeSprites, False, False)
-        if collision:
-            for plane in list(collision.values())[0]:
-                scoreKeeper.add_score(10)
-                # Kill each plane.
-                plane.kill()
-                
-                missileExplosionSound.play()
-                explosion = gameSprites.Explosion(plane.rect.center, 0)
-                allSprites.add(explosion)
-            # Take the first key of the dictionary (the missile) and kill it
-            missile = list(collision)[0]
-            missile.kill()
-            missile.set_position((-30, 10))
-        
-        # Check for collision of player with planes.
-        collision = pygame.sprite.spritecollide(player, planeSprites, False)
-        if collision:
-            for plane in collision:
-                scoreKeeper.add_score(5)
-                # Kill each plane sprite.
-                plane.kill()
-                
-                missileExplosionSound.play()
-                explosion = gameSprites.Explosion(plane.rect.center, 0)
-                allSprites.add(explosion)
-            
-        # Check for collision of planes with left endzone
-        collision = pygame.sprite.spritecollide(leftEndzone, planeSprites, False)
-        for plane in collision:
-            # Subtract life from player
-            scoreKeeper.subtract_life()
-            
-            # Kill each plane sprite.
-            plane.kill()
-            
-            planeExplosionSound.play()
-            explosion = gameSprites.Explosion(plane.rect.center, 1)
-            allSprites.add(explosion)
-        
-        # Check for collision of planes with top endzone
-        collision = pygame.sprite.spritecollide(topEndzone, planeSprites, False)
-        for plane in collision:
-            # Reverse y-direction of plane.
-            plane.change_directionY()
-            
-        # Check for collision of planes with bottom endzone
-        collision = pygame.sprite.spritecollide(bottomEndzone, planeSprites, False)
-        for plane in collision:
-            # Reverse y-direction of plane.
-            plane.change_directionY()
-            
-        # Check for collision of missile with endzone
-        collision = pygame.sprite.groupcollide(missileSprites, endzoneSprites, True, False)
-        if collision:
-            # Get the missile object that collided with the endzone
-            missile = list(collision)[0]
-            
-            missileExplosionSound.play()
-            explosion = gameSprites.Explosion(missile.rect.center, 0)
-            allSprites.add(explosion)
-            
-            missile.kill()
-            
-        # If all planes are destroyed, one wave is completed
-        if not planeSprites:
-            timer -= 1
-            allSprites.add(waveLabel)
-            allSprites.move_to_front(waveLabel)
-            # If 2 seconds are up.
-            if not timer:
-                waveLabel.kill()
-                # Add one to wave number
-                scoreKeeper.add_wave()
-                waveLabel.add_wave()
-                
-                wave = []
-                for x in range(screen.get_width(), screen.get_width()+1000+\
-                               increase_plane*50, 100):
-                    # Make the planes bounce up and down after it reaches third
-                    # wave
-                    if scoreKeeper.wave >= 3:
-                        bounce = random.randint(-3, 3)
-                    else:
-                        bounce = 0
-                    # Generate random spawning y-coordinates
-                    y = random.randint(75, screen.get_height() - 25)
-                    wave.append(gameSprites.Plane(screen, (x, y), 5+speed_up//2, bounce))
-                speed_up += 1
-                increase_plane += 1
-                
-                # Set maximum speed up 
-                if speed_up > 10:
-                    speed_up = 10
-                    
-                # Add the waves to respective sprite groups
-                planeSprites.add(wave)
-                allSprites.add(wave)
-                # Reset timer.
-                timer = 60
-        
-        # Set up reload speed.
-        if moved:
-            reload -= 1
-            if reload == 0:
-                moved = False
-                player.reload()
-                reload = 15
-                
-        if scoreKeeper.check_lose():
-            keepGoing = False
-            
-        if hacks:
-            # Auto aim player rotation
-            if planeSprites:
-                if len(planeSprites) >= 2 and abs(planeSprites.sprites()[0].rect.centery - player.rect.centery) > 25:
-                    player.rotate(planeSprites.sprites()[1].rect.center)
-                else:
-                    player.rotate(planeSprites.sprites()[0].rect.center)
-        else:
-            # Get x and y coordinates of mouse to rotate turret in correct direction 
-            player.rotate(xy_position)
-                    
-        # Refresh screen
-        allSprites.clear(screen, background)
-        screen.blit(background, (0, 0))
-        allSprites.update()
-        allSprites.draw(screen)
-        pygame.display.flip()
-
-        if not moved:
-            pygame.draw.line(screen, (220, 220, 220), player.rect.center, xy_position)
-        
-    return scoreKeeper
-
-def main():
-    '''
-    This function defines the 'mainline logic' for the game.
-    '''
-    keepGoing = True
-    while keepGoing:
-        keepGoing, hacks = startMenu()
-        
-        if keepGoing:
-            scoreKeeper = game(hacks)
-            # Make sure only record score if it is greater than 0
-            if scoreKeeper.score:
-                gameOver(scoreKeeper)
-    
-    # Close the game window
-    pygame.quit()    
-         
-# Call the main function
-main()
+'''
+
+By: Mark Xue
+
+Date: May 3, 2019
+
+Description: This program is a tower defense game.
+
+
+AIRPLANE DEFENSE V2.0.0
+------------------------------------------------------------------------------
+This is a tower defense inspired game:
+The goal of the game is to survive as many waves of airplanes as possible, 
+with each wave having increasing speed, and reach the highest score possible.
+
+How to play this game:
+
+Controls:
+W, S, Q, and mouse control
+
+Pressing down W moves your player up and S moves it down.
+Use your mouse to move the cursor and left click to shoot down the airplanes 
+trying to reach the left side (your tower).
+Press Q anytime during the game to pause the game. 
+Left click anywhere or press Q again to unpause.
+Press F3 to show how long each part of a frame takes and F4 to save it to
+frame_trace.json (open it in chrome://tracing).
+
+If the planes hit your tank they will also die
+
+If the planes reach your tower, they will blow up and you will lose a life.
+
+You have a total of 20 lives.
+
+Scoring:
+10 points will be awarded for every hit with the missile
+5 points if you kill them with your tank
+No points will be rewarded if they blow up when hitting the tower.
+
+'''
+             
+# I - Import and Initialize
+import pygame
+import gameSprites
+import engine
+import renderer
+import highscores
+import replay
+import profiler
+import loader
+import audio
+import pipeline
+import telemetry
+import capture
+import argparse
+import time
+import os
+pygame.init()
+
+#Center screen
+os.environ['SDL_VIDEO_CENTERED'] = '1'
+
+def screenShown(name, since):
+    '''
+    This function prints how long it took to switch to the screen called name,
+    from since (a time.perf_counter() value) to its first frame on the window.
+    '''
+    print(f'{name} shown in {(time.perf_counter() - since) * 1000:.1f} ms')
+
+def gamePath(path, number):
+    '''
+    This function returns path with -number put before its extension
+    (game.replay becomes game-2.replay, a folder frames becomes frames-2), so
+    every game of a session is saved to its own file.
+    '''
+    root, extension = os.path.splitext(os.path.normpath(path))
+    return f'{root}-{number}{extension}'
+
+def instructionsScreen(crosshair, screen):
+    '''
+    This function is used to display the instructions picture to teach the user
+    how to play the game.
+    '''
+    entered = time.perf_counter()
+    controls = gameSprites.assets.image('images/instructions.png', False)
+    group = pygame.sprite.RenderUpdates(crosshair)
+    keepGoing = True
+    pygame.mouse.set_visible(False)
+    
+    # The picture never changes, so it is drawn once and only the crosshair
+    # is drawn again each frame
+    screen.blit(controls, (0, 0))
+    first = True
+    clock = pygame.time.Clock()
+    
+    while keepGoing:
+        clock.tick(30)
+        xy_position = pygame.mouse.get_pos()
+        crosshair.set_position(xy_position)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                keepGoing = False
+            # Exit when user left clicks
+            if event.type == pygame.MOUSEBUTTONDOWN and pygame.mouse.get_pressed()[0]:
+                keepGoing = False
+            
+        group.clear(screen, controls)
+        dirty = group.draw(screen)
+        if first:
+            pygame.display.flip()
+            screenShown('Instructions', entered)
+            first = False
+        else:
+            pygame.display.update(dirty)
+        
+def pauseScreen(crosshair, screen, background):
+    '''
+    This function is used to pause the game
+    '''
+    entered = time.perf_counter()
+    click = gameSprites.Label("left click anywhere to continue", 30, center=(screen.get_width()/2, 20))
+    # The picture fades in and out, every step of the fade is made the first
+    # time the game is paused
+    pause = gameSprites.assets.image('images/pause.png', False)
+    fadeRect, fades = renderer.fadeFrames(background, pause, (8, screen.get_height()//2-39))
+    # The label is part of the background while paused
+    layer = renderer.staticLayer(background, [click])
+    group = pygame.sprite.RenderUpdates(crosshair)
+    keepGoing = True
+    screen.blit(layer, (0, 0))
+    first = True
+    alpha = 255
+    add = -5
+    
+    # Assign key variables
+    clock = pygame.time.Clock()    
+    
+    while keepGoing:
+        # 30 frames loaded per second
+        clock.tick(30)
+        xy_position = pygame.mouse.get_pos()
+        crosshair.set_position(xy_position)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                keepGoing = False
+            # Exit when user left clicks
+            if event.type == pygame.MOUSEBUTTONDOWN and pygame.mouse.get_pressed()[0]:
+                keepGoing = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
+                    keepGoing = False
+                    
+        group.clear(screen, layer)
+        screen.blit(fades[alpha // 5], fadeRect)
+        alpha += add
+        if alpha <= 0:
+            add = 5
+        elif alpha >= 255:
+            add = -5
+        dirty = group.draw(screen)
+        if first:
+            pygame.display.flip()
+            screenShown('Pause', entered)
+            first = False
+        else:
+            pygame.display.update(dirty + [fadeRect])
+
+def splashScreen(screen, assetLoader):
+    '''
+    This function shows a loading bar until every file asked for from
+    assetLoader is loaded. It returns False if the window was closed.
+    '''
+    label = gameSprites.Label('loading', 30, center=(screen.get_width()/2, screen.get_height()/2 - 30))
+    bar = pygame.Rect(0, 0, 300, 20)
+    bar.center = (screen.get_width()//2, screen.get_height()//2 + 10)
+    
+    clock = pygame.time.Clock()
+    while not assetLoader.finished():
+        clock.tick(30)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+        # Convert what the worker decoded since the last frame
+        assetLoader.pump(0.02)
+        
+        filled = bar.copy()
+        filled.width = int(bar.width * assetLoader.progress())
+        screen.fill((0, 0, 0))
+        screen.blit(label.image, label.rect)
+        pygame.draw.rect(screen, (0, 255, 255), filled)
+        pygame.draw.rect(screen, (0, 255, 255), bar, 1)
+        pygame.display.flip()
+    return True
+
+def startMenu(store, assetLoader):
+    '''
+    This function is the start menu of the game.
+    store : the HighscoreStore with the scores to list.
+    assetLoader : the AssetLoader, it keeps loading the game's sounds while
+                  the menu is shown.
+    '''
+    entered = time.perf_counter()
+    # Display
+    screen = pygame.display.set_mode((640, 480))
+    pygame.display.set_caption('Airplane Defense')
+    
+    # Entities
+    # A copy since the buttons are drawn on it
+    background = gameSprites.assets.image('images/background.png', False).copy()
+    # Save rect attributes to check for mouse on buttons collision
+    startButton = pygame.draw.rect(background, (0, 255, 255), (349, 165, 105, 25), 1)
+    hacksToggle = pygame.draw.rect(background, (0, 255, 255), (349, 265, 200, 25), 1)
+    controlsButton = pygame.draw.rect(background, (0, 255, 255), (349, 215, 180, 25), 1)
+    screen.blit(background, (0, 0))
+    
+    assetLoader.music('sounds/musicEarth.mp3')
+    pygame.mixer.music.set_volume(0.3)
+    pygame.mixer.music.play(-1)    
+    
+    '''
+    For all the correct comments, these are just copy and pasted code from
+    the game function.
+    '''
+    # Load same things for training grounds before game starts
+    leftEndzone = gameSprites.EndZone(screen, -screen.get_width(), 0, False)
+    rightEndzone = gameSprites.EndZone(screen, screen.get_width(), 0, False)
+    topEndzone = gameSprites.EndZone(screen, 0, 0, True)
+    bottomEndzone = gameSprites.EndZone(screen, 0, screen.get_height(), True)
+    scoreKeeper = gameSprites.ScoreKeeper(screen)
+    player = gameSprites.Player(screen)
+    missile = gameSprites.Projectile(screen, (-30, 10))
+    crosshair = gameSprites.Crosshair()
+    # Preload all sprite images so it doesn't lag when actual explosion comes
+    # (the splash screen already loaded them, so this only builds the lists)
+    gameSprites.assets.preload()
+    # Build every turret and missile rotation now instead of during the game
+    for path in ('images/turret.png', 'images/emptyTurret.png', 'images/missile.png'):
+        gameSprites.rotations.precompute(gameSprites.assets.image(path))
+    missileSprites = pygame.sprite.Group()
+    endzoneSprites = pygame.sprite.Group(leftEndzone, rightEndzone, topEndzone,\
+                                         bottomEndzone)
+        
+    # Start button and border definitions
+    start = gameSprites.Label('start', 30, left=350, top=150)
+    startBorderx = range(startButton.left, startButton.right + 1)
+    startBordery = range(startButton.top, startButton.bottom + 1)
+    # Control instruction button and border definitions
+    controls = gameSprites.Label('controls', 30, left=350, top=200)
+    controlsBorderx = range(controlsButton.left, controlsButton.right + 1)
+    controlsBordery = range(controlsButton.top, controlsButton.bottom + 1)
+    # Hack toggle and border definitions
+    hack = gameSprites.Label('Hacks: off', 30, left=350, top=250)
+    hackBorderx = range(hacksToggle.left, hacksToggle.right + 1)
+    hackBordery = range(hacksToggle.top, hacksToggle.bottom + 1)
+    title = gameSprites.Label('List of highscores:', 30, left=120, top=70)
+    
+    # List of highscores (kept in memory by the store)
+    y_pos = 100
+    highscores = []    
+    # pygame.font.render does not aceept \n so it must be done manually.
+    for line in store.lines():
+        highscores.append(gameSprites.Label(line, 30, left=120, top=y_pos))
+        y_pos += 30
+        
+    # The labels never move, so they are drawn on the background once (and
+    # again when one of them changes) and only the rest is drawn each frame
+    labels = highscores + [start, title, hack, controls, scoreKeeper]
+    layer = renderer.staticLayer(background, labels)
+    screen.blit(layer, (0, 0))
+    allSprites = pygame.sprite.OrderedUpdates(player, crosshair)
+    full = True
+    
+    # ACTION
+    
+    # Assign key variables
+    clock = pygame.time.Clock()
+    
+    # Hacks is computer playing the game.
+    hacks = False
+    moved = False
+    keepGoing = True
+    reload = 15
+    pygame.mouse.set_visible(False)
+    xy_position = pygame.mouse.get_pos()
+    
+    # Loop
+    while keepGoing:
+        
+        # Time
+        clock.tick(30)
+        
+        # Event Handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False, hacks
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if pygame.mouse.get_pressed() == (1, 0, 0):
+                    # Check if player clicks start
+                    if xy_position[0] in startBorderx and xy_position[1] in startBordery:
+                        return True, hacks
+                    # Check if player clicks instructions button
+                    if xy_position[0] in controlsBorderx and xy_position[1] in controlsBordery:
+                        instructionsScreen(crosshair, screen)
+                        entered = time.perf_counter()
+                        screen.blit(layer, (0, 0))
+                        full = True
+                        break
+                    # Check if player toggles hacks
+                    if xy_position[0] in hackBorderx and xy_position[1] in hackBordery:
+                        if hacks:
+                            hack.change_text('Hacks: off')
+                            pygame.mixer.music.set_volume(0.3)
+                            hacks = False
+                        else:
+                            hack.change_text('Hacks: on')
+                            pygame.mixer.music.set_volume(0)
+                            hacks = True
+                        layer = renderer.staticLayer(background, labels)
+                        screen.blit(layer, (0, 0))
+                        full = True
+        
+        # Player movement        
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_w]:
+            player.move(-10)
+        if keys[pygame.K_s]:
+            player.move(10)        
+            
+        xy_position = pygame.mouse.get_pos()
+        crosshair.set_position(xy_position)
+        
+        # Shoot a missile
+        if pygame.mouse.get_pressed()[0] and not moved:
+            player.shoot()
+            missile = gameSprites.projectiles.acquire(screen, player.rect.center)
+            missile.set_speed(xy_position)
+            missile.rotate(xy_position)
+            allSprites.add(missile)
+            missileSprites.add(missile)
+            moved = True
+        
+        # Check for collision of missile with endzone    
+        collision = pygame.sprite.groupcollide(missileSprites, endzoneSprites, True, False)
+        if collision:
+            missile = list(collision)[0]
+            explosion = gameSprites.explosions.acquire(missile.rect.center, 0)
+            allSprites.add(explosion)
+            missile.kill()
+            
+        # Set up reload speed
+        if moved:
+            reload -= 1
+            if reload == 0:
+                moved = False
+                player.reload()
+                reload = 15
+        player.rotate(xy_position)
+        
+        # Take in the sounds loaded in the background
+        assetLoader.pump()
+        
+        # Refresh display       
+        allSprites.clear(screen, layer)
+        allSprites.update()
+        dirty = allSprites.draw(screen)
+        if full:
+            pygame.display.flip()
+            full = False
+        else:
+            pygame.display.update(dirty)
+        # Only switching to the menu is timed (not redrawing its labels)
+        if entered:
+            screenShown('Menu', entered)
+            entered = None
+        assetLoader.report('Time to first frame')
+
+def gameOver(scoreKeeper, store, hacks):
+    '''
+    This function is the endgame screen.
+    store : the HighscoreStore the score is recorded in.
+    hacks : a bool value, True if the computer played.
+    '''
+    entered = time.perf_counter()
+    # Display
+    screen = pygame.display.set_mode((640, 480))    
+    pygame.display.set_caption("Airplane Defense")
+    
+    # Entities
+    # A copy since the button is drawn on it
+    background = gameSprites.assets.image('images/background.png', False).copy()
+    # Save rect attributes to check for collision with mouse on button
+    button = pygame.draw.rect(background, (0, 255, 255), (220, 395, 160, 25), 1)
+    screen.blit(background, (0, 0))
+    
+    crosshair = gameSprites.Crosshair()
+    
+    # Save the score (and the wave, date and hacks) to the highscores
+    store.record(scoreKeeper, hacks)
+    
+    labelBorderx = range(button.left, button.right + 1)
+    labelBordery = range(button.top, button.bottom + 1)
+    
+    label1 = gameSprites.Label('game over!', 90, center=(screen.get_width()/2, 160))
+    label2 = gameSprites.Label('your score has been recorded', 30, left=25, top=220)
+    label3 = gameSprites.Label('continue', 30, left=220, top=380)
+    label4 = gameSprites.Label(f'Score: {scoreKeeper.score} Wave: {scoreKeeper.wave}', 30, center=(screen.get_width()/2, 305))
+    # Only the crosshair moves, the labels are drawn on the background once
+    layer = renderer.staticLayer(background, [label1, label2, label3, label4])
+    screen.blit(layer, (0, 0))
+    allSprites = pygame.sprite.OrderedUpdates(crosshair)
+    first = True
+    
+    # ACTION
+    # Assign key variables
+    clock = pygame.time.Clock()
+    
+    # Loop
+    while True:
+        # Timer to set frame rate
+        clock.tick(30)
+        
+        # Events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+                
+        # If the mouse click is on the label
+        xy_position = pygame.mouse.get_pos()
+        if pygame.mouse.get_pressed()[0] == 1:
+            if xy_position[0] in labelBorderx and xy_position[1] in labelBordery:
+                return
+            
+        crosshair.set_position(xy_position)
+        
+        # Refresh display
+        allSprites.clear(screen, layer)
+        allSprites.update()
+        dirty = allSprites.draw(screen)
+        if first:
+            pygame.display.flip()
+            screenShown('Game over', entered)
+            first = False
+        else:
+            pygame.display.update(dirty)
+
+def game(hacks, dirtyRects=False, record=None, fps=60, assetLoader=None, threaded=False,
+         telemetryTarget=None, capturePath=None):
+    '''
+    This function is the game loop.
+    dirtyRects : True to only update the parts of the window that changed
+                 each frame instead of flipping the whole window.
+    record : if given, the path of a file the game's inputs are recorded to
+             (see replay.py).
+    fps : the most frames drawn per second (0 for no limit). The game itself
+          always runs at engine.STEP_RATE steps per second.
+    assetLoader : the AssetLoader that prefetched the music and sounds (a new
+                  one is made if not given).
+    threaded : True to run the simulation on its own thread (see
+               pipeline.py), the window's thread only draws.
+    telemetryTarget : if given, the state after every frame is streamed to
+                      this file (or UNIX socket, written 'unix:PATH'), see
+                      telemetry.py.
+    capturePath : if given, every frame drawn is recorded to this folder as
+                  PNG files, or to this file as raw RGB if it ends with .rgb
+                  (see capture.py).
+    '''
+    start = time.perf_counter()
+    if assetLoader is None:
+        assetLoader = loader.AssetLoader()
+    
+    # Display
+    screen = pygame.display.set_mode((640, 480))    
+    pygame.display.set_caption("Airplane Defense")
+     
+    # Entities
+    background = gameSprites.assets.image('images/background.png', False)
+    screen.blit(background, (0, 0))
+    
+    # Prefetched while the menu was shown
+    assetLoader.music('sounds/musicLife.mp3')
+    pygame.mixer.music.set_volume(0.1)
+    pygame.mixer.music.play(-1)    
+    
+    missileExplosionSound = assetLoader.sound('sounds/explosion.wav')
+    planeExplosionSound = assetLoader.sound('sounds/ono.wav')
+    
+    # Sounds the simulation can ask for, played on at most 4 + 3 channels.
+    # A plane reaching the tower is more important than a missile hit.
+    voices = audio.VoiceManager({'missile': missileExplosionSound, 'plane': planeExplosionSound},
+                                budgets={'missile': 4, 'plane': 3},
+                                priorities={'missile': 0, 'plane': 1},
+                                volumes={'missile': 0.3, 'plane': 1.0})
+    
+    # Times each part of the frame, only while the F3 overlay is shown.
+    frameProfiler = profiler.FrameProfiler()
+    overlay = profiler.ProfilerOverlay(frameProfiler)
+    
+    # The simulation holds every sprite (player, planes, missile, labels).
+    # On its own thread it cannot share the profiler with the drawing.
+    if threaded:
+        world = engine.GameWorld(screen, hacks)
+    else:
+        world = engine.GameWorld(screen, hacks, profiler=frameProfiler)
+    
+    recorder = None
+    if record:
+        recorder = replay.InputRecorder(record, world)
+    
+    sink = None
+    if telemetryTarget:
+        if telemetryTarget.startswith('unix:'):
+            sink = telemetry.TelemetryWriter(telemetryTarget[5:], screen.get_size(), unix=True)
+        else:
+            sink = telemetry.TelemetryWriter(telemetryTarget, screen.get_size())
+    
+    frameRecorder = None
+    if capturePath:
+        frameRecorder = capture.FrameRecorder(capturePath)
+    
+    simulation = None
+    if threaded:
+        simulation = pipeline.SimulationThread(world, recorder, sink)
+        gameRenderer = renderer.SnapshotRenderer(screen, background, world.planes.images,
+                                                 frameProfiler)
+    elif dirtyRects:
+        gameRenderer = renderer.DirtyRenderer(screen, background, profiler=frameProfiler)
+    else:
+        gameRenderer = renderer.FullRenderer(screen, background, frameProfiler)
+    
+    # ACTION
+
+    # Assign
+    clock = pygame.time.Clock()
+    timestep = engine.FixedTimestep()
+    keepGoing = True
+    # Q was pressed since the last step (recorded with the next step)
+    paused = False
+    
+    # Hide the mouse cursor to display crosshair.
+    pygame.mouse.set_visible(False)
+    
+    if simulation:
+        simulation.start()
+ 
+    # Loop
+    while keepGoing:
+     
+        # Time
+        clock.tick(fps)
+        frameProfiler.begin_frame()
+     
+        # Events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                keepGoing = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
+                    if simulation:
+                        # The pause screen uses the world's crosshair
+                        simulation.pausePressed = True
+                        simulation.hold()
+                    paused = True
+                    pauseScreen(world.crosshair, screen, background)
+                    screen.blit(background, (0, 0))
+                    gameRenderer.invalidate()
+                    # Do not catch up the time spent paused
+                    timestep.reset()
+                    if simulation:
+                        simulation.release()
+                # Show or hide the frame profiler
+                if event.key == pygame.K_F3:
+                    if frameProfiler.enabled:
+                        frameProfiler.disable()
+                        overlay.kill()
+                    elif simulation:
+                        frameProfiler.enable()
+                        gameRenderer.overlays.add(overlay)
+                    else:
+                        frameProfiler.enable()
+                        world.allSprites.add(overlay, layer=1)
+                # Save the profiled frames
+                if event.key == pygame.K_F4 and frameProfiler.frames:
+                    frameProfiler.export('frame_trace.json')
+
+        # Get coordinates of mouse to later use to rotate player and missile
+        xy_position = pygame.mouse.get_pos()
+        keys = pygame.key.get_pressed()
+        inputs = engine.FrameInput(keys[pygame.K_w], keys[pygame.K_s], \
+                                   pygame.mouse.get_pressed()[0], xy_position)
+        frameProfiler.mark('events')
+        
+        if simulation:
+            # The simulation thread steps with the newest inputs, draw the
+            # newest snapshot it made
+            simulation.inputs = inputs
+            # A step failed on the simulation thread, fail here too
+            if simulation.error:
+                raise simulation.error
+            snapshot, published = simulation.buffer.latest()
+            voices.play(simulation.buffer.take_sounds())
+            if snapshot.loaded:
+                gameRenderer.render(snapshot, xy_position, simulation.alpha(published))
+            else:
+                gameRenderer.render(snapshot, alpha=simulation.alpha(published))
+            if frameRecorder:
+                frameRecorder.capture(screen)
+            frameProfiler.mark('flip')
+            assetLoader.report('Menu to game', start)
+            if snapshot.lost:
+                keepGoing = False
+            continue
+        
+        # Run as many steps of the game as the time since the last frame
+        sounds = []
+        for step in range(timestep.advance()):
+            world.step(inputs)
+            if recorder:
+                recorder.record(inputs, paused)
+            if sink:
+                sink.record(world)
+            paused = False
+            sounds.extend(world.sounds)
+            if world.lost:
+                keepGoing = False
+                break
+        # Every explosion of the frame at once
+        voices.play(sounds)
+                    
+        # Refresh screen (with the aiming line while the turret is loaded),
+        # drawn between the last two steps
+        if world.moved:
+            gameRenderer.render(world, alpha=timestep.alpha())
+        else:
+            gameRenderer.render(world, xy_position, timestep.alpha())
+        if frameRecorder:
+            frameRecorder.capture(screen)
+        frameProfiler.mark('flip')
+        assetLoader.report('Menu to game', start)
+        
+    if simulation:
+        simulation.stop()
+        print(f'Snapshots: {simulation.buffer.stats()}')
+    if recorder:
+        recorder.close()
+    if sink:
+        sink.close()
+        print(f'Telemetry: {sink.stats()}')
+    if frameRecorder:
+        frameRecorder.close()
+        print(f'Frames recorded: {frameRecorder.stats()}')
+    print(f'Sounds: {voices.stats()}')
+    return world.scoreKeeper
+
+def main():
+    '''
+    This function defines the 'mainline logic' for the game.
+    '''
+    parser = argparse.ArgumentParser(description='Airplane Defense')
+    parser.add_argument('--record', metavar='FILE',
+                        help='record the inputs of each game to its own file, FILE with the '
+                             'number of the game added (game.replay becomes game-1.replay, '
+                             'game-2.replay ...), play them back with replay.py')
+    parser.add_argument('--fps', type=int, default=60,
+                        help='most frames drawn per second, 0 for no limit (default 60)')
+    parser.add_argument('--telemetry', metavar='TARGET',
+                        help='stream the state of every frame to a file per game, TARGET with '
+                             'the number of the game added (game.tel becomes game-1.tel ...), '
+                             'or to a UNIX socket with unix:PATH (a new connection every game), '
+                             'read them with telemetry.py')
+    parser.add_argument('--capture', metavar='PATH',
+                        help='record every frame of each game as PNG files in a folder per game, '
+                             'PATH with the number of the game added (frames-1, frames-2 ...), '
+                             'or as raw RGB video if PATH ends with .rgb (game-1.rgb ...)')
+    parser.add_argument('--threaded', action='store_true',
+                        help='run the simulation on its own thread while the window is drawn')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='only update the parts of the window that changed each frame')
+    args = parser.parse_args()
+    
+    # Load the highscores once
+    store = highscores.HighscoreStore()
+    
+    # Load every image and the menu music in the background while the
+    # splash screen is shown
+    screen = pygame.display.set_mode((640, 480))
+    pygame.display.set_caption('Airplane Defense')
+    assetLoader = loader.AssetLoader()
+    # The sprite images come from one atlas sheet (only loaded one by one if
+    # it cannot be made)
+    assetLoader.request_atlas()
+    assetLoader.request_images(['images/background.png', 'images/pause.png',
+                                'images/instructions.png'], False)
+    assetLoader.request_music('sounds/musicEarth.mp3')
+    keepGoing = splashScreen(screen, assetLoader)
+    
+    # Then the game's music and sounds while the menu is shown
+    assetLoader.request_music('sounds/musicLife.mp3')
+    assetLoader.request_sounds(['sounds/explosion.wav', 'sounds/ono.wav'])
+    
+    # Games played this session, each one is saved to its own files
+    games = 0
+    while keepGoing:
+        keepGoing, hacks = startMenu(store, assetLoader)
+        
+        if keepGoing:
+            games += 1
+            record = args.record and gamePath(args.record, games)
+            telemetryTarget = args.telemetry
+            if telemetryTarget and not telemetryTarget.startswith('unix:'):
+                telemetryTarget = gamePath(telemetryTarget, games)
+            capturePath = args.capture and gamePath(args.capture, games)
+            scoreKeeper = game(hacks, args.dirty_rects, record, args.fps,
+                               assetLoader=assetLoader, threaded=args.threaded,
+                               telemetryTarget=telemetryTarget, capturePath=capturePath)
+            # Make sure only record score if it is greater than 0
+            if scoreKeeper.score:
+                gameOver(scoreKeeper, store, hacks)
+    
+    # Close the game window
+    pygame.quit()    
+         
+# Call the main function
+main()
@@ -0,0 +1,205 @@
+'''
+
+Description: This module runs the game's simulation on its own thread. The
+simulation thread steps the GameWorld at engine.STEP_RATE and publishes an
+engine.Snapshot after each batch of steps; the window's thread reads the
+newest snapshot, plays its sounds and draws it. pygame lets go of the GIL
+while it blits and flips, so on a computer with more than one core the next
+steps are simulated while the last ones are drawn, and a slow flip no longer
+holds up the simulation.
+
+Only the simulation thread touches the GameWorld while it runs (hold() it
+first to use the world from another thread, like the pause screen does).
+An exception raised by a step stops the thread and is kept in its error, so
+the window's thread can raise it again instead of drawing the last snapshot
+forever.
+
+'''
+
+import time
+import threading
+import engine
+
+class SnapshotBuffer(object):
+    '''
+    This class hands the newest Snapshot from the simulation thread to the
+    window's thread. Snapshots are never changed once published, so the
+    simulation makes the next one while the last one is drawn (like a triple
+    buffer, without copying) and the reader always gets the newest one. The
+    sounds of every step are kept until taken, so none are lost when the
+    reader skips a snapshot.
+    '''
+    def __init__(self, snapshot):
+        '''
+        This initializer takes the first snapshot to hand out.
+        '''
+        self.lock = threading.Lock()
+        self.snapshot = snapshot
+        # time.perf_counter() when the snapshot was published
+        self.time = time.perf_counter()
+        self.sounds = []
+
+        # Counters to check how many snapshots were never drawn
+        self.published = 0
+        self.read = 0
+        self.lastRead = None
+
+    def publish(self, snapshot, sounds):
+        '''
+        This method replaces the newest snapshot and adds the sounds asked
+        for by the steps before it.
+        '''
+        now = time.perf_counter()
+        with self.lock:
+            self.snapshot = snapshot
+            self.time = now
+            self.sounds.extend(sounds)
+            self.published += 1
+
+    def latest(self):
+        '''
+        This method returns the newest snapshot and when it was published.
+        '''
+        with self.lock:
+            snapshot, published = self.snapshot, self.time
+        if snapshot is not self.lastRead:
+            self.lastRead = snapshot
+            self.read += 1
+        return snapshot, published
+
+    def take_sounds(self):
+        '''
+        This method returns the sounds published since the last call.
+        '''
+        with self.lock:
+            sounds = self.sounds
+            self.sounds = []
+        return sounds
+
+    def stats(self):
+        '''
+        This method returns a dictionary with the counters.
+        '''
+        return {'published': self.published, 'drawn': self.read,
+                'skipped': max(0, self.published - self.read)}
+
+class SimulationThread(threading.Thread):
+    '''
+    This class steps a GameWorld on its own thread with the newest inputs
+    given to it and publishes a Snapshot to its buffer after every batch of
+    steps. It stops on its own when the game is lost.
+    '''
+    def __init__(self, world, recorder=None, sink=None, rate=engine.STEP_RATE):
+        '''
+        This initializer takes 4 parameters:
+        world : the GameWorld to step.
+        recorder : a replay.InputRecorder the inputs of each step are
+                   recorded to (None to not record).
+        sink : a telemetry.TelemetryWriter the state after each step is
+               streamed to (None to not stream).
+        rate : simulation steps per second.
+        '''
+        threading.Thread.__init__(self, name='Simulation', daemon=True)
+        self.world = world
+        self.recorder = recorder
+        self.sink = sink
+        self.timestep = engine.FixedTimestep(rate)
+        self.buffer = SnapshotBuffer(world.snapshot())
+
+        # Newest FrameInput from the window's thread
+        self.inputs = engine.NO_INPUT
+        # Q was pressed since the last step (recorded with the next step)
+        self.pausePressed = False
+
+        self.condition = threading.Condition()
+        # True while the window's thread wants the world for itself
+        self.holding = False
+        # True while the thread waits for release()
+        self.idle = False
+        self.stopped = False
+        # The exception that stopped the thread (None if it did not fail)
+        self.error = None
+
+    def run(self):
+        '''
+        This method runs on the simulation thread until stop() is called,
+        the game is lost or a step raises an exception (kept in error).
+        '''
+        try:
+            self.simulate()
+        except Exception as error:
+            self.error = error
+
+    def simulate(self):
+        '''
+        This method steps the world and publishes snapshots (see run()).
+        '''
+        world = self.world
+        timestep = self.timestep
+        while True:
+            with self.condition:
+                if self.holding:
+                    self.idle = True
+                    self.condition.notify_all()
+                    while self.holding and not self.stopped:
+                        self.condition.wait()
+                    self.idle = False
+                    # Do not catch up the time spent held
+                    timestep.reset()
+                if self.stopped:
+                    return
+
+            sounds = []
+            steps = timestep.advance()
+            for step in range(steps):
+                inputs = self.inputs
+                world.step(inputs)
+                if self.recorder:
+                    self.recorder.record(inputs, self.pausePressed)
+                if self.sink:
+                    self.sink.record(world)
+                self.pausePressed = False
+                sounds.extend(world.sounds)
+                if world.lost:
+                    break
+            if steps:
+                self.buffer.publish(world.snapshot(), sounds)
+            if world.lost:
+                return
+
+            # Wait for the next step
+            time.sleep(max(0.0, timestep.step_time - timestep.accumulator))
+
+    def alpha(self, published):
+        '''
+        This method returns how far the current time is between the snapshot
+        published at published and the next one (0 to 1).
+        '''
+        return min((time.perf_counter() - published) / self.timestep.step_time, 1.0)
+
+    def hold(self):
+        '''
+        This method waits until the simulation thread is between steps and
+        keeps it there until release() is called.
+        '''
+        with self.condition:
+            self.holding = True
+            while not self.idle and self.is_alive():
+                self.condition.wait(0.1)
+
+    def release(self):
+        '''
+        This method lets the simulation thread run again after hold().
+        '''
+        with self.condition:
+            self.holding = False
+            self.condition.notify_all()
+
+    def stop(self):
+        '''
+        This method stops the simulation thread and waits for it to end.
+        '''
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.join()
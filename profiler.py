@@ -0,0 +1,183 @@
+'''
+
+Description: This module measures how long each phase of a frame takes
+(events, bot, collisions, spawning, updates, drawing and the flip), keeps the
+last frames in a fixed size ring buffer, shows the averages in an overlay and
+exports them as a Chrome trace (open it in chrome://tracing or Perfetto).
+
+When it is disabled every call returns straight away.
+
+'''
+
+import json
+import time
+import numpy
+import pygame
+import gameSprites
+
+# Phases of a frame, in the order they happen.
+PHASES = ('events', 'bot', 'collisions', 'spawn', 'update', 'draw', 'flip')
+PHASE_INDEX = dict((phase, index) for index, phase in enumerate(PHASES))
+
+class FrameProfiler(object):
+    '''
+    This class records the time spent in each phase of the last capacity
+    frames. Call begin_frame() when a frame starts and mark(phase) when each
+    phase ends.
+    '''
+    def __init__(self, capacity=600, enabled=False):
+        '''
+        This initializer takes 2 parameters:
+        capacity : how many frames are kept (older ones are overwritten).
+        enabled : True to start recording straight away.
+        '''
+        self.capacity = capacity
+        self.enabled = False
+        # Nanoseconds per (frame, phase) and when each frame started
+        self.durations = None
+        self.starts = None
+        self.frames = 0
+        self.slot = 0
+        self.last = 0
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        '''
+        This method clears the buffer and starts recording (the current frame
+        counts as started).
+        '''
+        self.durations = numpy.zeros((self.capacity, len(PHASES)), numpy.int64)
+        self.starts = numpy.zeros(self.capacity, numpy.int64)
+        self.frames = 0
+        self.enabled = True
+        self.begin_frame()
+
+    def disable(self):
+        '''
+        This method stops recording (what was recorded is kept).
+        '''
+        self.enabled = False
+
+    def begin_frame(self):
+        '''
+        This method starts a new frame.
+        '''
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.slot = self.frames % self.capacity
+        self.frames += 1
+        self.starts[self.slot] = now
+        self.durations[self.slot] = 0
+        self.last = now
+
+    def mark(self, phase):
+        '''
+        This method ends phase: the time since the last mark is added to it.
+        '''
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.durations[self.slot, PHASE_INDEX[phase]] += now - self.last
+        self.last = now
+
+    def recorded(self):
+        '''
+        This method returns the indices of the finished frames in the buffer,
+        oldest first.
+        '''
+        finished = self.frames - 1
+        count = min(finished, self.capacity - 1)
+        first = self.frames - 1 - count
+        return numpy.arange(first, first + count) % self.capacity
+
+    def stats(self):
+        '''
+        This method returns a dictionary of phase to (average, p99) in
+        milliseconds over the finished frames in the buffer, plus 'frame'
+        for the whole frame.
+        '''
+        stats = {}
+        frames = self.recorded()
+        if not len(frames):
+            return stats
+        durations = self.durations[frames] / 1e6
+        for phase, index in PHASE_INDEX.items():
+            stats[phase] = (float(durations[:, index].mean()),
+                            float(numpy.percentile(durations[:, index], 99)))
+        total = durations.sum(axis=1)
+        stats['frame'] = (float(total.mean()), float(numpy.percentile(total, 99)))
+        return stats
+
+    def export(self, path):
+        '''
+        This method writes the finished frames in the buffer to path as a
+        Chrome trace (JSON). Each phase is one event placed right after the
+        phase before it.
+        '''
+        events = []
+        for slot in self.recorded():
+            start = int(self.starts[slot])
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': start / 1000,
+                           'dur': int(self.durations[slot].sum()) / 1000})
+            for phase, index in PHASE_INDEX.items():
+                duration = int(self.durations[slot, index])
+                if duration:
+                    events.append({'name': phase, 'ph': 'X', 'pid': 1, 'tid': 1,
+                                   'ts': start / 1000, 'dur': duration / 1000})
+                start += duration
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+class ProfilerOverlay(pygame.sprite.Sprite):
+    '''
+    This class defines a sprite showing the rolling average and p99 of each
+    phase of a FrameProfiler in the corner of the screen.
+    '''
+    def __init__(self, profiler, every=15):
+        '''
+        This initializer takes 2 parameters:
+        profiler : the FrameProfiler to show.
+        every : the text is only made again every this many frames.
+        '''
+        # Call the parent __init__() method
+        pygame.sprite.Sprite.__init__(self)
+
+        self.profiler = profiler
+        self.every = every
+        self.count = 0
+        self.image = pygame.Surface((1, 1), pygame.SRCALPHA)
+        self.rect = self.image.get_rect()
+
+    def update(self):
+        '''
+        This method will be called automatically to refresh the numbers.
+        '''
+        self.count += 1
+        if self.count % self.every != 1:
+            return
+        stats = self.profiler.stats()
+        lines = ['phase       avg    p99 ms']
+        for phase in PHASES + ('frame',):
+            if phase in stats:
+                average, p99 = stats[phase]
+                lines.append(f'{phase:<10}{average:>6.2f}{p99:>7.2f}')
+
+        # Not through fonts.render(), the numbers change too often to be
+        # worth keeping and would push the labels out of its cache
+        with gameSprites.fonts.lock:
+            font = gameSprites.fonts.font(12)
+            surfaces = [font.render(line, True, (255, 255, 0)) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 10
+        height = sum(surface.get_height() for surface in surfaces) + 10
+        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.image.fill((0, 0, 0, 160))
+        y = 5
+        for surface in surfaces:
+            self.image.blit(surface, (5, y))
+            y += surface.get_height()
+        self.rect = self.image.get_rect()
+        # The corner of the window, whatever size it is
+        self.rect.bottomright = pygame.display.get_surface().get_rect().bottomright
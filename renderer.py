@@ -0,0 +1,217 @@
+'''
+
+Description: This module draws a GameWorld onto the window. FullRenderer
+redraws and flips the whole window every frame, DirtyRenderer only pushes the
+parts of the window that changed. SnapshotRenderer draws the snapshots
+made by a simulation thread instead (see pipeline.py).
+
+It also makes the still parts of the menus once: staticLayer() draws labels
+onto a copy of the background and fadeFrames() blends a faded image over the
+background for every alpha ahead of time.
+
+'''
+
+import functools
+import pygame
+import swarm
+
+# Colour of the line from the turret to the mouse
+LINE_COLOUR = (220, 220, 220)
+
+def staticLayer(background, sprites):
+    '''
+    This function returns a copy of background with the images of sprites
+    (labels and other things that never move) drawn on it, in order. Use it
+    as the background of a screen so they are not drawn every frame.
+    '''
+    layer = background.copy()
+    layer.blits([(sprite.image, sprite.rect) for sprite in sprites], False)
+    return layer
+
+@functools.lru_cache(maxsize=8)
+def fadeFrames(background, image, position, step=5):
+    '''
+    This function returns (rect, frames): where image goes on the window
+    when its top left is at position, and that part of background with image
+    drawn over it at alpha 0, step, 2 * step, ... up to 255 (frames[alpha //
+    step]). The frames are made once for each background and image.
+    '''
+    rect = image.get_rect(topleft=position)
+    # A copy since its alpha is changed
+    faded = image.copy()
+    under = background.subsurface(rect)
+    frames = []
+    for alpha in range(0, 256, step):
+        frame = under.copy()
+        faded.set_alpha(alpha)
+        frame.blit(faded, (0, 0))
+        frames.append(frame)
+    return rect, frames
+
+class FullRenderer(object):
+    '''
+    This class redraws the whole background and every sprite, then flips the
+    whole window, every frame.
+    '''
+    def __init__(self, screen, background, profiler=None):
+        '''
+        This initializer takes the window surface, the background image and
+        optionally a FrameProfiler (the drawing is marked before the flip).
+        '''
+        self.screen = screen
+        self.background = background
+        self.profiler = profiler
+
+    def invalidate(self):
+        '''
+        This method is called when something else drew over the window (like
+        the pause screen). The full renderer redraws everything anyway.
+        '''
+        pass
+
+    def render(self, world, line_end=None, alpha=1.0):
+        '''
+        This method draws world and shows it in the window.
+        line_end : if given, a line is drawn from the turret to this (x, y)
+                   point (the aiming line).
+        alpha : how far between the last two steps to draw everything that
+                moves (see engine.FixedTimestep).
+        '''
+        moved = world.interpolate(alpha)
+        world.draw(self.screen, self.background, alpha)
+        if line_end:
+            pygame.draw.line(self.screen, LINE_COLOUR, world.player.rect.center, line_end)
+        world.restore(moved)
+        if self.profiler:
+            self.profiler.mark('draw')
+        pygame.display.flip()
+
+class DirtyRenderer(object):
+    '''
+    This class only erases what was drawn last frame, draws the sprites and
+    planes again, and updates the window where something changed. The result
+    looks the same as FullRenderer.
+    '''
+    def __init__(self, screen, background, max_rects=1000, profiler=None):
+        '''
+        This initializer takes 4 parameters:
+        screen : the window surface.
+        background : the background image (same size as the window).
+        max_rects : if more than this many rects changed, the whole window is
+                    flipped instead since it is cheaper.
+        profiler : a FrameProfiler, the drawing is marked before the window
+                   is updated.
+        '''
+        self.screen = screen
+        self.background = background
+        self.max_rects = max_rects
+        self.profiler = profiler
+        # Everything drawn last frame (it has to be erased this frame).
+        self.previous = []
+        # True when the whole window has to be redrawn.
+        self.full = True
+
+    def invalidate(self):
+        '''
+        This method makes the next frame redraw the whole window, used after
+        something else drew over it (like the pause screen).
+        '''
+        self.full = True
+
+    def render(self, world, line_end=None, alpha=1.0):
+        '''
+        This method draws world and shows it in the window.
+        line_end : if given, a line is drawn from the turret to this (x, y)
+                   point (the aiming line).
+        alpha : how far between the last two steps to draw everything that
+                moves (see engine.FixedTimestep).
+        '''
+        screen = self.screen
+        background = self.background
+
+        # Erase last frame
+        if self.full:
+            screen.blit(background, (0, 0))
+        else:
+            screen.blits([(background, rect, rect) for rect in self.previous], False)
+
+        # Draw in the same order as GameWorld.draw
+        moved = world.interpolate(alpha)
+        drawn = world.planes.draw(screen, alpha)
+        # The group returns where it actually blitted (explosion frames can be
+        # bigger than the sprite's rect)
+        drawn.extend(world.allSprites.draw(screen))
+        if line_end:
+            drawn.append(pygame.draw.line(screen, LINE_COLOUR, world.player.rect.center, line_end))
+        world.restore(moved)
+
+        if self.profiler:
+            self.profiler.mark('draw')
+
+        # Show only what changed (the old and new places of everything)
+        if self.full or len(drawn) + len(self.previous) > self.max_rects:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + drawn)
+        self.previous = drawn
+        self.full = False
+
+class SnapshotRenderer(object):
+    '''
+    This class draws engine.Snapshot objects the same way FullRenderer draws
+    a GameWorld, so the game can be drawn while the simulation thread runs
+    the next steps. Sprites added to overlays (like the profiler overlay)
+    are drawn on top.
+    '''
+    def __init__(self, screen, background, planeImages, profiler=None):
+        '''
+        This initializer takes 4 parameters:
+        screen : the window surface.
+        background : the background image (same size as the window).
+        planeImages : the plane image of each variant (PlaneSwarm.images).
+        profiler : a FrameProfiler, the drawing is marked before the flip.
+        '''
+        self.screen = screen
+        self.background = background
+        self.planeImages = planeImages
+        self.profiler = profiler
+        self.overlays = pygame.sprite.Group()
+
+    def invalidate(self):
+        '''
+        This method does nothing, everything is redrawn every frame.
+        '''
+        pass
+
+    def render(self, snapshot, line_end=None, alpha=1.0):
+        '''
+        This method draws snapshot and shows it in the window.
+        line_end : if given, a line is drawn from the turret to this (x, y)
+                   point (the aiming line).
+        alpha : how far between the step before the snapshot and the
+                snapshot to draw everything that moves.
+        '''
+        screen = self.screen
+        screen.blit(self.background, (0, 0))
+        swarm.drawPlanes(screen, self.planeImages, snapshot.planes, alpha)
+
+        playerCenter = None
+        for entry in snapshot.sprites:
+            image, rect, previous = entry
+            # Moved the same way as GameWorld.interpolate
+            if previous and alpha < 1:
+                x, y = previous
+                centerx, centery = rect.center
+                rect = rect.move(round(x + (centerx - x) * alpha) - centerx,
+                                 round(y + (centery - y) * alpha) - centery)
+            screen.blit(image, rect)
+            if entry is snapshot.player:
+                playerCenter = rect.center
+        if line_end and playerCenter:
+            pygame.draw.line(screen, LINE_COLOUR, playerCenter, line_end)
+
+        self.overlays.update()
+        self.overlays.draw(screen)
+        if self.profiler:
+            self.profiler.mark('draw')
+        pygame.display.flip()
@@ -0,0 +1,241 @@
+'''
+
+Description: This module records the inputs of a game to a small binary file
+and plays them back. A game is only its seed plus its inputs, so playing a
+recording back (as fast as possible, without a window) gives exactly the same
+final score.
+
+File format (all numbers little endian):
+    header  : b'ADRP', version (1 byte), hacks (1 byte), seed (8 bytes),
+              starting mouse x and y (4 bytes each, the first movement is
+              relative to them)
+    frames  : one record per run of frames
+              flags byte: bit 0 W, bit 1 S, bit 2 left click, bit 3 Q (pause),
+                          bit 4 mouse moved, bit 5 run
+              if mouse moved: x and y change since the last frame as zigzag
+                              varints
+              if run: a varint with the number of frames (all with the same
+                      keys and no mouse movement)
+    trailer : b'END', frames, score, wave, lives (4 byte ints)
+
+Usage: python replay.py FILE
+       (main.py --record game.replay saves each game of a session to its own
+       file: game-1.replay, game-2.replay ...)
+
+'''
+
+import sys
+import time
+import struct
+import engine
+
+MAGIC = b'ADRP'
+VERSION = 1
+HEADER = struct.Struct('<4sBBQii')
+TRAILER = struct.Struct('<3sIiii')
+
+# Flags byte
+UP = 1
+DOWN = 2
+FIRE = 4
+PAUSE = 8
+MOVED = 16
+RUN = 32
+
+def writeVarint(buffer, value):
+    '''
+    This function appends a non negative int to buffer, 7 bits per byte.
+    '''
+    while value >= 0x80:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def readVarint(data, position):
+    '''
+    This function reads a varint from data at position and returns the value
+    and the position after it.
+    '''
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+def zigzag(value):
+    '''
+    This function maps a signed int to a non negative one (0, -1, 1, -2 ...
+    become 0, 1, 2, 3 ...) so small changes either way stay small.
+    '''
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def unzigzag(value):
+    '''
+    This function undoes zigzag().
+    '''
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+class InputRecorder(object):
+    '''
+    This class writes the inputs of a game to a file as they happen.
+    '''
+    def __init__(self, path, world, flush_every=300):
+        '''
+        This initializer takes 3 parameters:
+        path : the file to write.
+        world : the GameWorld being recorded (for its seed and hacks).
+        flush_every : the buffered frames are written every this many frames.
+        '''
+        self.file = open(path, 'wb')
+        self.world = world
+        self.flush_every = flush_every
+        self.position = (0, 0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, bool(world.hacks), world.seed, 0, 0))
+
+        self.buffer = bytearray()
+        self.frames = 0
+        # Frames with the same keys and no mouse movement are written as one
+        # run: [flags, number of frames]
+        self.run = None
+
+    def end_run(self):
+        '''
+        This method writes the run of identical frames that was being counted.
+        '''
+        if self.run:
+            flags, count = self.run
+            if count == 1:
+                self.buffer.append(flags)
+            else:
+                self.buffer.append(flags | RUN)
+                writeVarint(self.buffer, count)
+            self.run = None
+
+    def record(self, inputs, paused=False):
+        '''
+        This method records the FrameInput of one frame.
+        paused : True if Q was pressed this frame.
+        '''
+        flags = UP * bool(inputs.up) | DOWN * bool(inputs.down) | \
+                FIRE * bool(inputs.fire) | PAUSE * bool(paused)
+        x, y = inputs.position
+        dx = x - self.position[0]
+        dy = y - self.position[1]
+        self.position = (x, y)
+        self.frames += 1
+
+        if dx or dy:
+            self.end_run()
+            self.buffer.append(flags | MOVED)
+            writeVarint(self.buffer, zigzag(dx))
+            writeVarint(self.buffer, zigzag(dy))
+        elif self.run and self.run[0] == flags:
+            self.run[1] += 1
+        else:
+            self.end_run()
+            self.run = [flags, 1]
+
+        if self.frames % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        '''
+        This method writes the buffered frames to the file.
+        '''
+        self.end_run()
+        self.file.write(self.buffer)
+        self.buffer = bytearray()
+        self.file.flush()
+
+    def close(self):
+        '''
+        This method writes the rest of the frames and the final score, then
+        closes the file.
+        '''
+        self.flush()
+        scoreKeeper = self.world.scoreKeeper
+        self.file.write(TRAILER.pack(b'END', self.frames, scoreKeeper.score,
+                                     scoreKeeper.wave, scoreKeeper.lives))
+        self.file.close()
+
+class Recording(object):
+    '''
+    This class holds a recording loaded from a file.
+    '''
+    def __init__(self, path):
+        '''
+        This initializer reads and decodes the file at path.
+        '''
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, hacks, seed, x, y = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a replay file')
+        self.hacks = bool(hacks)
+        self.seed = seed
+
+        # The trailer is missing if the game crashed while recording.
+        end = len(data)
+        self.result = None
+        if data[-TRAILER.size:][:3] == b'END':
+            end -= TRAILER.size
+            self.result = TRAILER.unpack_from(data, end)[1:]
+
+        # Decode every frame into (FrameInput, paused)
+        self.frames = []
+        position = HEADER.size
+        while position < end:
+            flags = data[position]
+            position += 1
+            count = 1
+            if flags & MOVED:
+                dx, position = readVarint(data, position)
+                dy, position = readVarint(data, position)
+                x += unzigzag(dx)
+                y += unzigzag(dy)
+            if flags & RUN:
+                count, position = readVarint(data, position)
+            frame = (engine.FrameInput(bool(flags & UP), bool(flags & DOWN),
+                                       bool(flags & FIRE), (x, y)), bool(flags & PAUSE))
+            self.frames.extend([frame] * count)
+
+def play(path):
+    '''
+    This function plays a recording back without a window, as fast as
+    possible, and returns (HeadlessResult, Recording).
+    '''
+    recording = Recording(path)
+    screen = engine.initHeadless()
+    world = engine.GameWorld(screen, recording.hacks, recording.seed)
+
+    start = time.perf_counter()
+    for inputs, paused in recording.frames:
+        world.step(inputs)
+    wall_time = time.perf_counter() - start
+
+    return engine.HeadlessResult(world.scoreKeeper, world.frames, wall_time), recording
+
+def main():
+    '''
+    This function plays back the file given on the command line and checks
+    the score against the recorded one.
+    '''
+    result, recording = play(sys.argv[1])
+    scoreKeeper = result.scoreKeeper
+    played = (result.frames, scoreKeeper.score, scoreKeeper.wave, scoreKeeper.lives)
+    print(f'Frames: {played[0]} Score: {played[1]} Wave: {played[2]} Lives: {played[3]} '
+          f'({result.wall_time:.2f} s)')
+    if recording.result is None:
+        print('The recording has no final score (the game did not finish).')
+    elif tuple(recording.result) == played:
+        print('Matches the recorded game.')
+    else:
+        print(f'Does NOT match the recorded game: {recording.result}')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
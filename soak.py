@@ -0,0 +1,257 @@
+'''
+
+Description: A soak test for running the bot unattended for a long time. It
+plays endless made up waves (with a set number of planes and range of
+speeds) without a window and, every interval, samples the memory Python has
+allocated (tracemalloc), the size of every sprite group, pool and cache, and
+the frame time percentiles.
+
+At the end it fits a line through the samples (after the warm up ones) and
+fails, with a report and exit code 1, if the memory, the p99 frame time or
+any of the sizes grew by more than its threshold over the run. Since every
+wave is alike, a game that does not leak should stay flat.
+
+tracemalloc makes the game slower, so the frame times are only comparable
+with other soak runs.
+
+Usage: python soak.py [--minutes 10] [--planes 100] [--min-speed 5]
+                      [--max-speed 10] [--interval 30] [--output FILE]
+
+'''
+
+import os
+# Must be set before pygame is initialized.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import numpy
+import pygame
+import gameSprites
+import engine
+import renderer
+
+class SoakWorld(engine.GameWorld):
+    '''
+    This class is a bot game that never ends: every wave has the same
+    number of planes (at a random speed in a range) and losing every life
+    does not stop it.
+    '''
+    def __init__(self, screen, planes=100, speeds=(5, 10), bounce=3, spread=1000, seed=None):
+        '''
+        This initializer takes 6 parameters:
+        screen : the pygame surface the game is played on.
+        planes : the number of planes in every wave.
+        speeds : (slowest, fastest) x speed of a wave.
+        bounce : the fastest the planes move up or down.
+        spread : the planes of a wave start this many pixels apart at most
+                 (right of the screen).
+        seed : seed for the game's random numbers (None picks one).
+        '''
+        self.planeCount = planes
+        self.speeds = speeds
+        self.bounce = bounce
+        self.spread = spread
+        engine.GameWorld.__init__(self, screen, True, seed)
+
+    def spawn_wave(self):
+        '''
+        This method adds the next made up wave of planes.
+        '''
+        width, height = self.screen.get_size()
+        rng = self.rng
+        centers = [(width + rng.randrange(self.spread), rng.randint(75, height - 25))
+                   for plane in range(self.planeCount)]
+        bounces = [rng.randint(-self.bounce, self.bounce) for plane in range(self.planeCount)]
+        variants = [rng.randrange(2) for plane in range(self.planeCount)]
+        self.add_planes(centers, rng.randint(*self.speeds), bounces, variants)
+
+def sizes(world):
+    '''
+    This function returns a dictionary with the size of everything in world
+    (and the shared pools and caches) that could keep growing.
+    '''
+    return {'allSprites': len(world.allSprites),
+            'missileSprites': len(world.missileSprites),
+            'planes': len(world.planes),
+            'plane slots': world.planes.count,
+            'arrivals': len(world.arrivals),
+            'free missiles': len(gameSprites.projectiles.free),
+            'free explosions': len(gameSprites.explosions.free),
+            'explosion frames': sum(len(frames) for frames in gameSprites.assets.frameLists.values()),
+            'rotations': len(gameSprites.rotations.cache),
+            'texts': len(gameSprites.fonts.rendered)}
+
+def drift(times, values, warmup):
+    '''
+    This function returns how much values grew over the run, from a line
+    fitted through them (the first warmup samples are left out), or 0 if
+    there are not enough samples.
+    '''
+    times = numpy.array(times[warmup:], float)
+    values = numpy.array(values[warmup:], float)
+    if len(times) < 3:
+        return 0.0
+    slope = numpy.polyfit(times, values, 1)[0]
+    return float(slope * (times[-1] - times[0]))
+
+def soak(seconds, interval=30, planes=100, speeds=(5, 10), draw=True, seed=None):
+    '''
+    This function plays a SoakWorld for seconds and returns the samples
+    taken every interval seconds, and the first and last tracemalloc
+    snapshots.
+    draw : True to also draw every frame (on the dummy display).
+    Each sample is a dictionary with 'time', 'frames', 'memory' (bytes),
+    'p50' and 'p99' (ms, over the frames since the sample before) and
+    'sizes' (the most of each size since the sample before).
+    '''
+    screen = engine.initHeadless()
+    background = gameSprites.assets.image('images/background.png', False)
+    world = SoakWorld(screen, planes, speeds, seed=seed)
+    gameRenderer = renderer.FullRenderer(screen, background)
+
+    tracemalloc.start()
+    first = None
+    samples = []
+    frameTimes = []
+    peaks = sizes(world)
+    start = time.perf_counter()
+    nextSample = start + interval
+    end = start + seconds
+    while True:
+        before = time.perf_counter_ns()
+        world.step()
+        if draw:
+            gameRenderer.render(world)
+        frameTimes.append(time.perf_counter_ns() - before)
+
+        # Keep the most of each size (one sample could miss a short peak)
+        for name, size in sizes(world).items():
+            if size > peaks[name]:
+                peaks[name] = size
+
+        now = time.perf_counter()
+        if now < nextSample and now < end:
+            continue
+        durations = numpy.array(frameTimes) / 1e6
+        samples.append({'time': now - start, 'frames': world.frames,
+                        'memory': tracemalloc.get_traced_memory()[0],
+                        'p50': float(numpy.percentile(durations, 50)),
+                        'p99': float(numpy.percentile(durations, 99)),
+                        'sizes': peaks})
+        last = tracemalloc.take_snapshot()
+        if first is None:
+            first = last
+        frameTimes = []
+        peaks = sizes(world)
+        nextSample += interval
+        if now >= end:
+            break
+    tracemalloc.stop()
+    return samples, first, last
+
+def check(samples, warmup, memory, p99, growth):
+    '''
+    This function returns a list of what drifted upward in samples:
+    memory : the most bytes the traced memory can grow.
+    p99 : the most the p99 frame time can grow, as a fraction of the first
+          sample after the warm up.
+    growth : the most a size can grow, as a fraction of its first sample
+             after the warm up (and by at least 4).
+    '''
+    if len(samples) <= warmup:
+        return []
+    times = [sample['time'] for sample in samples]
+    failures = []
+
+    grown = drift(times, [sample['memory'] for sample in samples], warmup)
+    if grown > memory:
+        failures.append(f'memory grew {grown / 1e6:.2f} MB (limit {memory / 1e6:.2f} MB)')
+
+    base = samples[warmup]['p99']
+    grown = drift(times, [sample['p99'] for sample in samples], warmup)
+    if grown > base * p99:
+        failures.append(f'p99 frame time grew {grown:.2f} ms from {base:.2f} ms (limit {p99:.0%})')
+
+    for name, size in samples[warmup]['sizes'].items():
+        grown = drift(times, [sample['sizes'][name] for sample in samples], warmup)
+        if grown > max(4, size * growth):
+            failures.append(f'{name} grew by {grown:.0f} from {size}')
+    return failures
+
+def speed(text):
+    '''
+    This function reads a wave speed from the command line (planes must
+    move left at least one pixel a frame).
+    '''
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not at least 1')
+    return value
+
+def main():
+    '''
+    This function reads the command line, runs the soak test and prints
+    the report.
+    '''
+    parser = argparse.ArgumentParser(description='Play endless bot waves and check for leaks and slowdowns.')
+    parser.add_argument('--minutes', type=float, default=10,
+                        help='how long to play (default: %(default)s)')
+    parser.add_argument('--interval', type=float, default=30,
+                        help='seconds between samples (default: %(default)s)')
+    parser.add_argument('--warmup', type=int, default=2,
+                        help='first samples left out of the checks (default: %(default)s)')
+    parser.add_argument('--planes', type=int, default=100,
+                        help='planes in every wave (default: %(default)s)')
+    parser.add_argument('--min-speed', type=speed, default=5,
+                        help='slowest wave speed (default: %(default)s)')
+    parser.add_argument('--max-speed', type=speed, default=10,
+                        help='fastest wave speed (default: %(default)s)')
+    parser.add_argument('--no-draw', action='store_true',
+                        help='only run the simulation')
+    parser.add_argument('--seed', type=int, help="the game's seed")
+    parser.add_argument('--max-memory', type=float, default=1,
+                        help='memory growth in MB reported as a leak (default: %(default)s)')
+    parser.add_argument('--max-p99', type=float, default=0.25,
+                        help='p99 frame time growth reported as a slowdown (default: %(default)s)')
+    parser.add_argument('--max-growth', type=float, default=0.5,
+                        help='group, pool or cache growth reported as a leak (default: %(default)s)')
+    parser.add_argument('--output', metavar='FILE', help='save the samples as JSON')
+    args = parser.parse_args()
+    if args.min_speed > args.max_speed:
+        parser.error('--min-speed cannot be more than --max-speed')
+
+    samples, first, last = soak(args.minutes * 60, args.interval, args.planes,
+                                (args.min_speed, args.max_speed), not args.no_draw, args.seed)
+    pygame.quit()
+
+    names = list(samples[0]['sizes'])
+    print(f'{"s":>6}{"frames":>9}{"MB":>8}{"p50":>7}{"p99":>7}  ' + '  '.join(names))
+    for sample in samples:
+        print(f'{sample["time"]:>6.0f}{sample["frames"]:>9}{sample["memory"] / 1e6:>8.2f}'
+              f'{sample["p50"]:>7.2f}{sample["p99"]:>7.2f}  ' +
+              '  '.join(f'{sample["sizes"][name]:>{len(name)}}' for name in names))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'arguments': vars(args), 'samples': samples}, file, indent=1)
+
+    failures = check(samples, args.warmup, args.max_memory * 1e6, args.max_p99, args.max_growth)
+    if not failures:
+        print('\nNo drift found')
+        return
+    print('\nDrift found:')
+    for failure in failures:
+        print(f'  {failure}')
+    # Where the memory grew the most
+    print('\nLargest allocation growth:')
+    for statistic in last.compare_to(first, 'lineno')[:10]:
+        print(f'  {statistic}')
+    sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+'''
+
+Description: This module stores every plane of a game in NumPy arrays instead
+of one Sprite per plane, so moving, bouncing and collision checks are a few
+vectorized operations per frame no matter how many planes there are.
+
+'''
+
+import numpy
+import pygame
+import gameSprites
+
+class PlaneSwarm(object):
+    '''
+    This class holds all the planes as a struct of arrays. Plane i is at
+    (left[i], top[i]) and moves the same way as gameSprites.Plane: dx pixels
+    left every frame and dy pixels up once it is on the screen.
+    Planes are kept in the order they were spawned, like a sprite Group.
+    '''
+    def __init__(self, screen, capacity=64):
+        '''
+        This initializer takes 2 parameters:
+        screen : the pygame surface, used so planes only move up and down
+                 after they pass the right side of it.
+        capacity : how many planes to make room for at the start (the arrays
+                   grow on their own).
+        '''
+        self.screen = screen
+
+        # The two plane images, picked by each plane's variant. They are
+        # never rotated, so RLE copies can be used (about 3x faster to blit).
+        self.images = []
+        for image in gameSprites.assets.planes():
+            image = image.copy()
+            image.set_alpha(255, pygame.RLEACCEL)
+            self.images.append(image)
+        self.sizes = numpy.array([image.get_size() for image in self.images])
+
+        # Number of slots used (alive or dead) and number of alive planes
+        self.count = 0
+        self.alive_count = 0
+        self.allocate(capacity)
+        
+    def allocate(self, capacity):
+        '''
+        This method makes (or grows) the arrays to hold capacity planes.
+        '''
+        old = self.count
+        arrays = {}
+        for name, dtype in (('left', numpy.int32), ('top', numpy.int32),
+                            ('width', numpy.int32), ('height', numpy.int32),
+                            ('dx', numpy.int32), ('dy', numpy.int32),
+                            ('variant', numpy.int8), ('alive', bool)):
+            array = numpy.zeros(capacity, dtype)
+            if old:
+                array[:old] = getattr(self, name)[:old]
+            arrays[name] = array
+        self.__dict__.update(arrays)
+
+    def __len__(self):
+        '''
+        This method returns the number of alive planes.
+        '''
+        return self.alive_count
+
+    def compact(self):
+        '''
+        This method removes dead planes from the arrays, keeping the spawn
+        order of the alive ones.
+        '''
+        keep = numpy.flatnonzero(self.alive[:self.count])
+        size = len(keep)
+        for name in ('left', 'top', 'width', 'height', 'dx', 'dy', 'variant'):
+            array = getattr(self, name)
+            array[:size] = array[keep]
+        self.alive[:self.count] = False
+        self.alive[:size] = True
+        self.count = size
+
+    def spawn(self, centers, x_speed, y_speeds, variants):
+        '''
+        This method adds planes to the end of the swarm.
+        centers : list of (x, y) tuples for the center of each plane.
+        x_speed : speed every new plane moves left at (or a list with the
+                  speed of each plane).
+        y_speeds : list with the up and down speed of each plane.
+        variants : list with which image (0 or 1) each plane uses.
+        '''
+        self.compact()
+        new = len(centers)
+        if self.count + new > len(self.alive):
+            self.allocate(max(2 * len(self.alive), self.count + new))
+
+        part = slice(self.count, self.count + new)
+        variants = numpy.asarray(variants, numpy.int8)
+        centers = numpy.asarray(centers, numpy.int32).reshape(-1, 2)
+        self.variant[part] = variants
+        self.width[part] = self.sizes[variants, 0]
+        self.height[part] = self.sizes[variants, 1]
+        # Same as setting rect.center on a Rect of that size
+        self.left[part] = centers[:, 0] - self.width[part] // 2
+        self.top[part] = centers[:, 1] - self.height[part] // 2
+        self.dx[part] = x_speed
+        self.dy[part] = y_speeds
+        self.alive[part] = True
+
+        self.count += new
+        self.alive_count += new
+
+    def collide_rect(self, rect):
+        '''
+        This method returns the indices (in spawn order) of the alive planes
+        that overlap rect, using the same test as Rect.colliderect.
+        '''
+        if not self.alive_count:
+            return self.alive[:0].nonzero()[0]
+        n = self.count
+        left = self.left[:n]
+        top = self.top[:n]
+        hit = (left < rect.right) & (top < rect.bottom) & self.alive[:n]
+        hit &= left + self.width[:n] > rect.left
+        hit &= top + self.height[:n] > rect.top
+        return hit.nonzero()[0]
+
+    def kill(self, indices):
+        '''
+        This method removes the planes at indices.
+        '''
+        if len(indices):
+            self.alive_count -= int(numpy.count_nonzero(self.alive[indices]))
+            self.alive[indices] = False
+
+    def change_directionY(self, indices):
+        '''
+        This method reverses the y direction of the planes at indices, the
+        same as Plane.change_directionY.
+        '''
+        if len(indices):
+            self.dy[indices] = -self.dy[indices]
+            self.top[indices] -= self.dy[indices]
+
+    def center(self, index):
+        '''
+        This method returns the (x, y) center of one plane as a tuple.
+        '''
+        return (int(self.left[index]) + int(self.width[index]) // 2,
+                int(self.top[index]) + int(self.height[index]) // 2)
+
+    def first(self, number=1):
+        '''
+        This method returns the indices of the first number alive planes in
+        spawn order (like Group.sprites()[:number]).
+        '''
+        return self.alive[:self.count].nonzero()[0][:number]
+
+    def predict(self, steps, bounceRects):
+        '''
+        This method works out where every alive plane will be for the next
+        steps frames without changing anything, bouncing them off bounceRects
+        (the top and bottom endzone rects) the same way the game does.
+        It returns (indices, left, top), left and top have one row per
+        frame (row 0 is now) and one column per plane in indices.
+        '''
+        indices = self.alive[:self.count].nonzero()[0]
+        top = self.top[indices]
+        width = self.width[indices]
+        height = self.height[indices]
+        dy = self.dy[indices]
+
+        # Planes always move dx left, so every left is known straight away
+        steps = numpy.arange(steps + 1, dtype=numpy.int32)[:, None]
+        lefts = self.left[indices] - steps * self.dx[indices]
+        # They only move up and down once they are on the screen
+        moving = lefts < self.screen.get_width()
+        # Which planes are level with each endzone in each frame
+        levels = [(lefts < rect.right) & (lefts + width > rect.left) for rect in bounceRects]
+
+        tops = numpy.empty_like(lefts)
+        tops[0] = top
+        for step in range(1, len(steps)):
+            # Same as change_directionY() on each endzone's collide_rect()
+            for rect, level in zip(bounceRects, levels):
+                hit = (top < rect.bottom) & (top + height > rect.top) & level[step - 1]
+                if hit.any():
+                    dy = numpy.where(hit, -dy, dy)
+                    top = top - numpy.where(hit, dy, 0)
+            # Same as update()
+            top = top - dy * moving[step]
+            tops[step] = top
+        return indices, lefts, tops
+
+    def update(self):
+        '''
+        This method moves every plane one frame, the same as Plane.update.
+        '''
+        if not self.alive_count:
+            return
+        n = self.count
+        self.left[:n] -= self.dx[:n]
+        # Make sure only change y direction if passed right side of screen.
+        onScreen = self.left[:n] < self.screen.get_width()
+        self.top[:n] -= numpy.where(onScreen, self.dy[:n], 0)
+
+    def state(self):
+        '''
+        This method returns copies of (variant, left, top, dx, dy) of every
+        alive plane, dy being 0 for planes not on the screen yet (they did not
+        move up or down in the last update()). See drawPlanes().
+        '''
+        indices = self.alive[:self.count].nonzero()[0]
+        left = self.left[indices]
+        dy = numpy.where(left < self.screen.get_width(), self.dy[indices], 0)
+        return (self.variant[indices], left, self.top[indices], self.dx[indices], dy)
+
+    def draw(self, surface, alpha=1.0):
+        '''
+        This method draws every alive plane onto surface and returns the list
+        of rects that were drawn.
+        alpha : how far between the last two frames to draw the planes (0 is
+                where they were before the last update(), 1 is where they are
+                now).
+        '''
+        return drawPlanes(surface, self.images, self.state(), alpha)
+
+def drawPlanes(surface, images, state, alpha=1.0):
+    '''
+    This function draws planes given as PlaneSwarm.state() onto surface with
+    images (one per variant) and returns the list of rects that were drawn.
+    alpha : how far between the last two frames to draw the planes.
+    '''
+    variant, left, top, dx, dy = state
+    if alpha < 1:
+        # update() moved them by (-dx, -dy)
+        behind = 1 - alpha
+        left = numpy.rint(left + dx * behind).astype(numpy.int32)
+        top = numpy.rint(top + dy * behind).astype(numpy.int32)
+    positions = zip(variant.tolist(), left.tolist(), top.tolist())
+    return surface.blits([(images[variant], (left, top))
+                          for variant, left, top in positions])
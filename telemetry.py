@@ -0,0 +1,257 @@
+'''
+
+Description: This module streams the state of a game after every frame
+(where every plane and the missile are, the score, lives, wave and kills) to
+a file or a local UNIX socket, so bot runs can be graphed without watching
+the window. Frames are packed into fixed layout binary records, sent every
+few frames as one block, and written by a background thread so the game
+never waits for the disk. If the thread falls behind, the game waits a
+little for it and then drops the block (whole frames, so the stream can
+still be read). If writing fails (like the reader of the socket going
+away), the game goes on and the frames after it are dropped.
+
+File format (all numbers little endian):
+    header  : b'ADTM', version (1 byte), screen width and height (2 bytes
+              each)
+    records : one per frame
+              frame (4 byte unsigned), score, lives, wave (4 byte ints),
+              kills (4 byte unsigned), missile x and y (2 byte ints, both
+              NO_MISSILE when there is none), number of planes (4 byte
+              unsigned)
+              then the left of every plane and then the top of every plane
+              (2 byte ints each)
+
+main.py --telemetry game.tel writes each game of a session to its own file
+(game-1.tel, game-2.tel ...). With a UNIX socket every game is a new
+connection, starting with its own header.
+
+Usage: python telemetry.py FILE [FILE ...] (prints a summary of each stream)
+
+'''
+
+import sys
+import queue
+import socket
+import struct
+import threading
+import collections
+import numpy
+
+MAGIC = b'ADTM'
+VERSION = 1
+HEADER = struct.Struct('<4sBHH')
+RECORD = struct.Struct('<IiiiIhhI')
+
+# Missile position written when there is no missile on the screen
+NO_MISSILE = -32768
+
+# Fields of each record, as read by read()
+RECORD_TYPE = numpy.dtype([('frame', '<u4'), ('score', '<i4'), ('lives', '<i4'),
+                           ('wave', '<i4'), ('kills', '<u4'), ('missile_x', '<i2'),
+                           ('missile_y', '<i2'), ('planes', '<u4')])
+
+# What read() returns.
+# frames : a structured array (RECORD_TYPE) with one row per frame
+# planes : an (n, 2) array with the (left, top) of every plane of every frame
+# offsets : the planes of frame i are planes[offsets[i]:offsets[i + 1]]
+Telemetry = collections.namedtuple('Telemetry', 'width height frames planes offsets')
+
+class TelemetryWriter(object):
+    '''
+    This class packs the state of a GameWorld after each frame and hands
+    the packed frames, batch at a time, to a thread that writes them.
+    '''
+    def __init__(self, target, size, batch=30, unix=False, wait=0.05):
+        '''
+        This initializer takes 5 parameters:
+        target : the path of the file (or socket) to write to.
+        size : (width, height) of the screen the game is played on.
+        batch : the packed frames are sent every this many frames.
+        unix : True if target is a UNIX socket something listens on.
+        wait : the most seconds flush() waits for room in the queue before
+               dropping the frames.
+        '''
+        if unix:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(target)
+            self.file = self.socket.makefile('wb')
+        else:
+            self.socket = None
+            self.file = open(target, 'wb')
+        self.batch = batch
+        self.wait = wait
+        self.buffer = bytearray(HEADER.pack(MAGIC, VERSION, *size))
+        self.frames = 0
+        # Frames in the buffer
+        self.buffered = 0
+
+        # Counters to check how the stream went
+        self.dropped = 0
+        self.error = None
+
+        # Blocks of packed frames waiting for the thread (it is never more
+        # than a few blocks behind, the game waits a little if it is)
+        self.blocks = queue.Queue(8)
+        self.thread = threading.Thread(target=self.work, name='TelemetryWriter', daemon=True)
+        self.thread.start()
+
+    def record(self, world):
+        '''
+        This method packs the state of world after its last step.
+        '''
+        planes = world.planes
+        count = len(planes)
+        missile = NO_MISSILE, NO_MISSILE
+        for sprite in world.missileSprites:
+            missile = sprite.rect.center
+        scoreKeeper = world.scoreKeeper
+        self.buffer += RECORD.pack(world.frames, scoreKeeper.score, scoreKeeper.lives,
+                                   scoreKeeper.wave, world.kills, missile[0], missile[1], count)
+        if count:
+            # Two columns are cheaper to pack than (left, top) pairs
+            alive = planes.alive[:planes.count]
+            self.buffer.extend(planes.left[:planes.count][alive].astype('<i2'))
+            self.buffer.extend(planes.top[:planes.count][alive].astype('<i2'))
+
+        self.frames += 1
+        self.buffered += 1
+        if self.frames % self.batch == 0:
+            self.flush()
+
+    def flush(self):
+        '''
+        This method hands the packed frames to the thread. It returns False
+        if they were dropped.
+        '''
+        if not self.buffer:
+            return True
+        block = bytes(self.buffer)
+        frames = self.buffered
+        self.buffer = bytearray()
+        self.buffered = 0
+        if self.error or not self.thread.is_alive():
+            self.dropped += frames
+            return False
+        try:
+            self.blocks.put(block, timeout=self.wait)
+            return True
+        except queue.Full:
+            self.dropped += frames
+            return False
+
+    def work(self):
+        '''
+        This method runs on the thread and writes blocks until close().
+        '''
+        while True:
+            block = self.blocks.get()
+            if block is None:
+                break
+            if self.error:
+                continue
+            try:
+                self.file.write(block)
+            except OSError as error:
+                # Stop streaming, the game goes on
+                self.error = error
+        try:
+            self.file.close()
+        except OSError as error:
+            # The last bytes could not be sent
+            self.error = self.error or error
+        if self.socket:
+            self.socket.close()
+
+    def close(self):
+        '''
+        This method writes the frames left and waits for the thread to end.
+        '''
+        self.flush()
+        # Only wait for room while the thread is there to make it
+        while self.thread.is_alive():
+            try:
+                self.blocks.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.thread.join()
+
+    def stats(self):
+        '''
+        This method returns a dictionary with the counters.
+        '''
+        stats = {'frames': self.frames, 'dropped': self.dropped}
+        if self.error:
+            stats['error'] = str(self.error)
+        return stats
+
+def read(path):
+    '''
+    This function reads a telemetry stream into NumPy arrays and returns a
+    Telemetry. A record cut off at the end (a game that was killed) is
+    left out.
+    '''
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a telemetry stream')
+    if version != VERSION:
+        raise ValueError(f'{path} is version {version}, only {VERSION} can be read')
+
+    records = []
+    blocks = []
+    counts = []
+    position = HEADER.size
+    while position + RECORD.size <= len(data):
+        count = RECORD.unpack_from(data, position)[-1]
+        end = position + RECORD.size + count * 4
+        if end > len(data):
+            break
+        records.append(data[position:position + RECORD.size])
+        blocks.append(data[position + RECORD.size:end])
+        counts.append(count)
+        position = end
+
+    frames = numpy.frombuffer(b''.join(records), RECORD_TYPE)
+    # Each block is the lefts, then the tops
+    planes = numpy.zeros((sum(counts), 2), numpy.int16)
+    start = 0
+    for block, count in zip(blocks, counts):
+        planes[start:start + count] = numpy.frombuffer(block, '<i2').reshape(2, count).T
+        start += count
+    offsets = numpy.zeros(len(counts) + 1, numpy.int64)
+    numpy.cumsum(counts, out=offsets[1:])
+    return Telemetry(width, height, frames, planes, offsets)
+
+def summary(path):
+    '''
+    This function prints a summary of the stream at path.
+    '''
+    stream = read(path)
+    frames = stream.frames
+    if not len(frames):
+        print(f'{path}: no frames')
+        return
+    last = frames[-1]
+    print(f'{path}:')
+    print(f'{len(frames)} frames on a {stream.width}x{stream.height} screen')
+    print(f'Wave: {last["wave"]} Score: {last["score"]} Lives: {last["lives"]} '
+          f'Kills: {last["kills"]}')
+    print(f'Planes per frame: {frames["planes"].mean():.1f} on average, '
+          f'{frames["planes"].max()} at most')
+    print(f'Missile on the screen {(frames["missile_x"] != NO_MISSILE).mean():.0%} of frames')
+
+def main():
+    '''
+    This function prints a summary of each stream given on the command line
+    (like the games of one session).
+    '''
+    if len(sys.argv) < 2:
+        print('Usage: python telemetry.py FILE [FILE ...]')
+        sys.exit(2)
+    for path in sys.argv[1:]:
+        summary(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+'''
+
+Description: Tests for highscores.py (run with python -m pytest).
+
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+import highscores
+
+class HighscoreStoreTest(unittest.TestCase):
+    '''
+    This class tests HighscoreStore with files in a temporary folder.
+    '''
+    def setUp(self):
+        '''
+        This method makes the temporary folder.
+        '''
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'highscores.log')
+        self.textPath = os.path.join(self.folder, 'highscores.txt')
+
+    def tearDown(self):
+        '''
+        This method removes the temporary folder.
+        '''
+        shutil.rmtree(self.folder)
+
+    def store(self):
+        '''
+        This method returns a store reading the temporary files.
+        '''
+        return highscores.HighscoreStore(self.path, self.textPath)
+
+    def scores(self):
+        '''
+        This method returns the best scores read again from the log.
+        '''
+        return [run.score for run in self.store().top()]
+
+    def test_add(self):
+        '''
+        This method checks runs are kept in the log, best score first.
+        '''
+        store = self.store()
+        store.add(highscores.Run(100, 10, None, False))
+        store.add(highscores.Run(300, 20, None, True))
+        self.assertEqual(self.scores(), [300, 100])
+        with open(self.textPath) as file:
+            self.assertEqual(file.readline(), '1. 300\n')
+
+    def test_add_after_torn_line(self):
+        '''
+        This method checks a run added after a half written line (the game
+        was closed while saving) is not lost.
+        '''
+        self.store().add(highscores.Run(100, 10, None, False))
+        with open(self.path, 'a') as file:
+            file.write('{"score": 5')
+        self.assertEqual(self.scores(), [100])
+
+        self.store().add(highscores.Run(999, 30, None, False))
+        self.assertEqual(self.scores(), [999, 100])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,316 @@
+'''
+
+Description: A Gym style vector environment for training and comparing bots.
+It steps many headless games in lockstep (no window, no sound, no frame
+pacing) and returns what every game looks like and the rewards as stacked
+NumPy arrays. The games can be spread over worker processes.
+
+Actions are an array of shape (games, 4), one row per game:
+    move : -1 up, 0 stay, 1 down (W and S)
+    fire : 1 to shoot (left click, ignored while reloading)
+    x, y : where the mouse is (the missile flies towards it)
+
+Observations are a dictionary of arrays with one row per game:
+    planes : (games, max_planes, 4) center x, center y, x speed and y speed
+             of the planes closest to the tower, closest first
+    plane_mask : (games, max_planes) True where planes has a plane
+    player_y : the y of the player's center
+    reload : steps until the player can shoot again (0 when loaded)
+    lives, wave : what the score bar shows
+
+The reward of a step is the score it gained (10 a missile kill, 5 a tank
+kill, like ScoreKeeper) minus life_penalty for every life lost. A game that
+is lost (or reaches max_steps) is done and starts again straight away with
+the next seed, like Gym vector environments.
+
+Usage: python vecenv.py [--games 16] [--steps 2000] [--workers 0] [--bot]
+       (prints how many steps per second it runs)
+
+'''
+
+import time
+import argparse
+import multiprocessing
+import numpy
+import engine
+
+class EnvBatch(object):
+    '''
+    This class holds some of the games of a VectorEnv in this process.
+    '''
+    def __init__(self, indices, count, seed=0, max_planes=32, life_penalty=10, max_steps=0):
+        '''
+        This initializer takes 6 parameters:
+        indices : the numbers of the games held here (0 to count - 1).
+        count : how many games the whole VectorEnv has.
+        seed : game i plays seeds seed + i, seed + i + count, ... one per
+               episode, so the games are the same however they are split.
+        max_planes, life_penalty, max_steps : see VectorEnv.
+        '''
+        self.screen = engine.initHeadless()
+        self.indices = list(indices)
+        self.count = count
+        self.seed = seed
+        self.max_planes = max_planes
+        self.life_penalty = life_penalty
+        self.max_steps = max_steps
+        self.episodes = [0] * len(self.indices)
+        self.worlds = [None] * len(self.indices)
+
+    def new_world(self, slot):
+        '''
+        This method starts the next episode of the game in slot.
+        '''
+        seed = self.seed + self.indices[slot] + self.count * self.episodes[slot]
+        self.episodes[slot] += 1
+        self.worlds[slot] = engine.GameWorld(self.screen, False, seed)
+
+    def reset(self):
+        '''
+        This method starts a new episode of every game and returns the
+        observations.
+        '''
+        for slot in range(len(self.worlds)):
+            self.new_world(slot)
+        return self.observe()
+
+    def observe(self):
+        '''
+        This method returns the observations of every game.
+        '''
+        games = len(self.worlds)
+        planes = numpy.zeros((games, self.max_planes, 4), numpy.float32)
+        mask = numpy.zeros((games, self.max_planes), bool)
+        player = numpy.zeros((games, 4), numpy.int32)
+        for slot, world in enumerate(self.worlds):
+            swarm = world.planes
+            indices = swarm.alive[:swarm.count].nonzero()[0]
+            # The planes closest to the tower
+            indices = indices[numpy.argsort(swarm.left[indices], kind='stable')[:self.max_planes]]
+            count = len(indices)
+            planes[slot, :count, 0] = swarm.left[indices] + swarm.width[indices] // 2
+            planes[slot, :count, 1] = swarm.top[indices] + swarm.height[indices] // 2
+            planes[slot, :count, 2] = swarm.dx[indices]
+            planes[slot, :count, 3] = swarm.dy[indices]
+            mask[slot, :count] = True
+            scoreKeeper = world.scoreKeeper
+            player[slot] = (world.player.rect.centery, world.reload if world.moved else 0,
+                            scoreKeeper.lives, scoreKeeper.wave)
+        return {'planes': planes, 'plane_mask': mask, 'player_y': player[:, 0],
+                'reload': player[:, 1], 'lives': player[:, 2], 'wave': player[:, 3]}
+
+    def step(self, actions):
+        '''
+        This method steps every game with its row of actions and returns
+        (observations, rewards, dones, infos). infos has a dictionary for
+        each game, with the score, wave, steps and seed of the episode that
+        just ended for the games that are done.
+        '''
+        games = len(self.worlds)
+        rewards = numpy.zeros(games, numpy.float32)
+        dones = numpy.zeros(games, bool)
+        infos = [{} for slot in range(games)]
+        for slot, world in enumerate(self.worlds):
+            move, fire, x, y = (int(value) for value in actions[slot])
+            scoreKeeper = world.scoreKeeper
+            score = scoreKeeper.score
+            lives = scoreKeeper.lives
+            world.step(engine.FrameInput(move < 0, move > 0, bool(fire), (x, y)))
+            rewards[slot] = scoreKeeper.score - score - self.life_penalty * (lives - scoreKeeper.lives)
+
+            if world.lost or (self.max_steps and world.frames >= self.max_steps):
+                dones[slot] = True
+                infos[slot] = {'score': scoreKeeper.score, 'wave': scoreKeeper.wave,
+                               'steps': world.frames, 'seed': world.seed,
+                               'truncated': not world.lost}
+                self.new_world(slot)
+        return self.observe(), rewards, dones, infos
+
+    def bot_actions(self):
+        '''
+        This method returns the actions the hacks bot would take in every
+        game (about the same as GameWorld plays with hacks on), to compare
+        other bots with.
+        '''
+        actions = numpy.zeros((len(self.worlds), 4), numpy.int32)
+        for slot, world in enumerate(self.worlds):
+            planes = world.planes
+            if not planes:
+                continue
+            distance = planes.center(planes.first()[0])[1] - world.player.rect.centery
+            if abs(distance) >= 10:
+                actions[slot, 0] = 1 if distance > 0 else -1
+            if not world.moved:
+                actions[slot, 1] = 1
+                actions[slot, 2:] = world.solver.solve(world)[0]
+        return actions
+
+def work(connection, *arguments):
+    '''
+    This function runs in a worker process: it holds an EnvBatch made with
+    arguments and runs the commands sent through connection.
+    '''
+    batch = EnvBatch(*arguments)
+    while True:
+        command, value = connection.recv()
+        if command == 'reset':
+            connection.send(batch.reset())
+        elif command == 'step':
+            connection.send(batch.step(value))
+        elif command == 'bot':
+            connection.send(batch.bot_actions())
+        else:
+            break
+    connection.close()
+
+class VectorEnv(object):
+    '''
+    This class steps count Airplane Defense games in lockstep, in this
+    process or spread over worker processes.
+    '''
+    def __init__(self, count, seed=0, workers=0, max_planes=32, life_penalty=10, max_steps=0):
+        '''
+        This initializer takes 6 parameters:
+        count : the number of games.
+        seed : the seed of game 0's first episode (see EnvBatch).
+        workers : the number of worker processes the games are split over
+                  (0 to play them all in this process).
+        max_planes : how many planes are in each observation.
+        life_penalty : what losing a life takes off the reward.
+        max_steps : an episode is done after this many steps (0 for no
+                    limit, it ends when the game is lost).
+        '''
+        self.count = count
+        options = (count, seed, max_planes, life_penalty, max_steps)
+        self.batch = None
+        self.connections = []
+        self.processes = []
+        self.slices = []
+        if not workers:
+            self.batch = EnvBatch(range(count), *options)
+            return
+
+        # Split the games into workers slices as even as possible
+        bounds = numpy.linspace(0, count, min(workers, count) + 1).astype(int)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=work, args=(child, range(start, end)) + options,
+                                              daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+            self.slices.append(slice(start, end))
+
+    def gather(self, command, values=None):
+        '''
+        This method sends command to every worker (with its slice of values)
+        and returns the replies in order.
+        '''
+        for connection, games in zip(self.connections, self.slices):
+            connection.send((command, None if values is None else values[games]))
+        return [connection.recv() for connection in self.connections]
+
+    def reset(self):
+        '''
+        This method starts a new episode of every game and returns the
+        stacked observations.
+        '''
+        if self.batch:
+            return self.batch.reset()
+        return stack(self.gather('reset'))
+
+    def step(self, actions):
+        '''
+        This method steps every game with its row of actions (an array of
+        shape (count, 4)) and returns (observations, rewards, dones, infos).
+        '''
+        actions = numpy.asarray(actions)
+        if self.batch:
+            return self.batch.step(actions)
+        replies = self.gather('step', actions)
+        observations = stack([reply[0] for reply in replies])
+        rewards = numpy.concatenate([reply[1] for reply in replies])
+        dones = numpy.concatenate([reply[2] for reply in replies])
+        infos = [info for reply in replies for info in reply[3]]
+        return observations, rewards, dones, infos
+
+    def bot_actions(self):
+        '''
+        This method returns the actions of the hacks bot for every game.
+        '''
+        if self.batch:
+            return self.batch.bot_actions()
+        return numpy.concatenate(self.gather('bot'))
+
+    def close(self):
+        '''
+        This method stops the worker processes.
+        '''
+        for connection in self.connections:
+            connection.send(('close', None))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+def stack(observations):
+    '''
+    This function joins the observations of several EnvBatches into one.
+    '''
+    return dict((name, numpy.concatenate([observation[name] for observation in observations]))
+                for name in observations[0])
+
+def randomActions(rng, count):
+    '''
+    This function returns count rows of random actions.
+    '''
+    actions = numpy.zeros((count, 4), numpy.int32)
+    actions[:, 0] = rng.integers(-1, 2, count)
+    actions[:, 1] = rng.integers(0, 2, count)
+    actions[:, 2] = rng.integers(0, 640, count)
+    actions[:, 3] = rng.integers(0, 480, count)
+    return actions
+
+def main():
+    '''
+    This function steps a VectorEnv with random actions (or the hacks bot)
+    and prints how fast it runs.
+    '''
+    parser = argparse.ArgumentParser(description='Step many headless games at once.')
+    parser.add_argument('--games', type=int, default=16, help='number of games (default: %(default)s)')
+    parser.add_argument('--steps', type=int, default=2000,
+                        help='steps of every game (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='worker processes, 0 to play in this process (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--bot', action='store_true', help='play the hacks bot instead of random actions')
+    args = parser.parse_args()
+
+    env = VectorEnv(args.games, args.seed, args.workers)
+    rng = numpy.random.default_rng(args.seed)
+    env.reset()
+    total = numpy.zeros(args.games)
+    finished = []
+    start = time.perf_counter()
+    for step in range(args.steps):
+        if args.bot:
+            actions = env.bot_actions()
+        else:
+            actions = randomActions(rng, args.games)
+        observations, rewards, dones, infos = env.step(actions)
+        total += rewards
+        finished.extend(info for info in infos if info)
+    wall_time = time.perf_counter() - start
+    env.close()
+
+    steps = args.games * args.steps
+    print(f'{steps} steps in {wall_time:.2f} s ({steps / wall_time:.0f} steps/s)')
+    print(f'Reward per game: {total.mean():.1f} on average, {len(finished)} episodes finished')
+    if finished:
+        print(f'Finished episodes: score {numpy.mean([info["score"] for info in finished]):.1f} '
+              f'wave {numpy.mean([info["wave"] for info in finished]):.1f} on average')
+
+if __name__ == '__main__':
+    main()